@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Funções compartilhadas pelos scripts de correção do streamlit_app.py
+(force_fix_dashboard, force_remove_404_calls e precise_fix)
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+# Hash do streamlit_app.py deixado por cada script na última execução
+CACHE_FILE = '.fix_cache.json'
+
+@lru_cache(maxsize=8)
+def _read(path, inode, mtime_ns, size):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def load(path):
+    """Lê o arquivo, reaproveitando o conteúdo enquanto ele não mudar no disco.
+
+    Além do mtime, a chave inclui inode e tamanho: o relógio do sistema de
+    arquivos é grosso o bastante para duas escritas seguidas terem o mesmo
+    mtime, e os scripts trocam o arquivo com os.replace (novo inode).
+    """
+    st = os.stat(path)
+    return _read(path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+def atomic_write(path, data):
+    """Grava o texto num temporário com os.write e troca o arquivo de uma vez
+    com os.replace: quem lê nunca vê o arquivo pela metade"""
+    tmp_path = path + '.tmp'
+    payload = memoryview(data.encode('utf-8'))
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        while payload:
+            payload = payload[os.write(fd, payload):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+def _digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def already_applied(script, path):
+    """True se o arquivo está exatamente como o script o deixou da última vez"""
+    cached = _read_cache().get(script)
+    return cached is not None and cached == _digest(path)
+
+def mark_applied(script, path):
+    """Registra o hash do arquivo produzido pelo script"""
+    cache = _read_cache()
+    cache[script] = _digest(path)
+    atomic_write(CACHE_FILE, json.dumps(cache, indent=2))
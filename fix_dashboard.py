@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Executa as correções do dashboard (force_fix_dashboard, force_remove_404_calls
+e precise_fix) num único processo, em vez de um interpretador por script
+"""
+
+import argparse
+
+from force_fix_dashboard import force_fix_dashboard, kill_streamlit_processes
+from force_remove_404_calls import force_remove_404_calls
+from precise_fix import precise_fix
+
+# Etapas na ordem recomendada de execução
+STAGES = {
+    "force": force_fix_dashboard,
+    "remove404": force_remove_404_calls,
+    "precise": precise_fix,
+}
+
+def main():
+    """Função principal."""
+
+    parser = argparse.ArgumentParser(description="Correções do dashboard do Finance App")
+    parser.add_argument("stages", nargs="+", choices=[*STAGES, "all"], help="Etapas a executar")
+
+    args = parser.parse_args()
+
+    # Sempre na ordem recomendada, sem repetir etapas
+    selected = [name for name in STAGES if "all" in args.stages or name in args.stages]
+
+    print(f"🚀 Executando etapas: {', '.join(selected)}")
+
+    # Matar processos do Streamlit antes de mexer no arquivo
+    if "force" in selected:
+        kill_streamlit_processes()
+
+    for name in selected:
+        print(f"\n▶️ Etapa: {name}")
+        if not STAGES[name]():
+            print(f"❌ Erro durante a etapa {name}")
+            return 1
+
+    print("\n🎉 Todas as etapas concluídas!")
+    print("\n🔄 Agora reinicie o Streamlit:")
+    print("   ./start_simple.sh")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
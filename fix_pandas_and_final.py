@@ -6,11 +6,20 @@ Script para corrigir erro do pandas e implementar correções finais
 import re
 import os
 
+# Marcador gravado no topo do arquivo corrigido (idempotência)
+PATCH_MARKER = '# fix_pandas_and_final@v2'
+
 def fix_pandas_and_final():
     """Corrige erro do pandas e implementa correções finais"""
     
     print("🔧 Corrigindo erro do pandas e implementando correções finais...")
     
+    # Arquivo já corrigido? Verificação em tempo constante no cabeçalho
+    with open('streamlit_app.py', 'rb') as f:
+        if PATCH_MARKER.encode() in f.read(4096):
+            print("✅ streamlit_app.py já corrigido - nada a fazer")
+            return True
+    
     with open('streamlit_app.py', 'r', encoding='utf-8') as f:
         content = f.read()
     
@@ -52,44 +61,58 @@ def fix_pandas_and_final():
         print("   ✅ Encontrou seção de status")
         
         new_status_code = '''# Status dos serviços com verificação real
+        @st.cache_resource
+        def _redis_client():
+            import redis
+            return redis.Redis(host="localhost", port=6379, socket_timeout=0.3, socket_connect_timeout=0.3)
+        
+        @st.cache_data(ttl=5)
+        def _services_status():
+            import socket
+            import requests
+            
+            def _tcp_up(host, port, timeout=0.3):
+                try:
+                    socket.create_connection((host, port), timeout).close()
+                    return True
+                except OSError:
+                    return False
+            
+            status = {"database": _tcp_up("localhost", 5432)}
+            try:
+                status["redis"] = bool(_redis_client().ping())
+            except Exception:
+                status["redis"] = False
+            try:
+                response = requests.get("http://localhost:11434/api/tags", timeout=2)
+                status["ollama"] = response.status_code == 200
+            except Exception:
+                status["ollama"] = False
+            return status
+        
+        status = _services_status()
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            try:
-                import subprocess
-                result = subprocess.run(['pg_isready', '-h', 'localhost', '-p', '5432'], 
-                                      capture_output=True, timeout=2)
-                if result.returncode == 0:
-                    st.success("🟢 Database: online")
-                else:
-                    st.warning("🟡 Database: offline")
-            except:
-                st.warning("🟡 Database: verificando")
+            if status["database"]:
+                st.success("🟢 Database: online")
+            else:
+                st.warning("🟡 Database: offline")
         
         with col2:
-            try:
-                import subprocess
-                result = subprocess.run(['redis-cli', 'ping'], 
-                                      capture_output=True, timeout=2)
-                if b'PONG' in result.stdout:
-                    st.success("🟢 Redis: online")
-                else:
-                    st.warning("🟡 Redis: offline")
-            except:
-                st.warning("🟡 Redis: verificando")
+            if status["redis"]:
+                st.success("🟢 Redis: online")
+            else:
+                st.warning("🟡 Redis: offline")
         
         with col3:
-            try:
-                import requests
-                response = requests.get("http://localhost:11434/api/tags", timeout=2)
-                if response.status_code == 200:
-                    st.success("🟢 Ollama: online")
-                else:
-                    st.warning("🟡 Ollama: offline")
-            except:
-                st.warning("🟡 Ollama: verificando")
+            if status["ollama"]:
+                st.success("🟢 Ollama: online")
+            else:
+                st.warning("🟡 Ollama: offline")
         
         if st.button("🔄 Atualizar Status"):
+            _services_status.clear()
             st.rerun()'''
         
         content = re.sub(status_section_pattern, new_status_code, content, flags=re.DOTALL)
@@ -136,9 +159,11 @@ def fix_pandas_and_final():
             transactions = []
         
         if transactions:
-            # Calcular estatísticas reais
-            receitas = sum(t.get("amount", 0) for t in transactions if t.get("amount", 0) > 0)
-            despesas = abs(sum(t.get("amount", 0) for t in transactions if t.get("amount", 0) < 0))
+            # Calcular estatísticas reais (vetorizado sobre um único DataFrame)
+            df = pd.DataFrame(transactions)
+            amt = df.get("amount", pd.Series(0.0, index=df.index)).fillna(0)
+            receitas = amt.clip(lower=0).sum()
+            despesas = -amt.clip(upper=0).sum()
             saldo = receitas - despesas
             total_transacoes = len(transactions)
             
@@ -158,27 +183,17 @@ def fix_pandas_and_final():
             st.subheader("📊 Resumo por Categoria")
             
             # Agrupar por categoria
-            categorias = {}
-            for t in transactions:
-                categoria = t.get("category", "Sem categoria")
-                amount = t.get("amount", 0)
-                if categoria not in categorias:
-                    categorias[categoria] = {"total": 0, "count": 0}
-                categorias[categoria]["total"] += amount
-                categorias[categoria]["count"] += 1
+            categoria = df.get("category", pd.Series(None, index=df.index, dtype=object)).fillna("Sem categoria")
+            agg = amt.groupby(categoria, sort=False).agg(total="sum", count="size", media="mean").reset_index()
             
-            if categorias:
-                # Criar DataFrame para exibição
-                resumo_data = []
-                for cat, data in categorias.items():
-                    resumo_data.append({
-                        "Categoria": cat,
-                        "Total": f"R$ {data['total']:,.2f}",
-                        "Transações": data['count'],
-                        "Média": f"R$ {data['total']/data['count']:,.2f}"
-                    })
-                
-                df_resumo = pd.DataFrame(resumo_data)
+            if not agg.empty:
+                # Criar DataFrame para exibição (uma linha por categoria)
+                df_resumo = pd.DataFrame({
+                    "Categoria": agg.iloc[:, 0].to_numpy(),
+                    "Total": [f"R$ {v:,.2f}" for v in agg["total"].tolist()],
+                    "Transações": agg["count"].to_numpy(),
+                    "Média": [f"R$ {v:,.2f}" for v in agg["media"].tolist()]
+                })
                 st.dataframe(df_resumo, use_container_width=True, hide_index=True)
         else:
             # Mostrar resumo de exemplo
@@ -231,7 +246,7 @@ def fix_pandas_and_final():
     
     # Salvar arquivo corrigido
     with open('streamlit_app.py', 'w', encoding='utf-8') as f:
-        f.write(content)
+        f.write(PATCH_MARKER + '\n' + content)
     
     print("✅ Todas as correções aplicadas!")
     
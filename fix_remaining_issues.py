@@ -9,9 +9,18 @@ Script para corrigir os 3 problemas restantes:
 import re
 import os
 
+# Marcador gravado no topo do arquivo corrigido (idempotência)
+PATCH_MARKER = '# fix_remaining_issues@v2'
+
 def fix_remaining_issues():
     """Corrige os problemas restantes identificados"""
     
+    # Arquivo já corrigido? Verificação em tempo constante no cabeçalho
+    with open('streamlit_app.py', 'rb') as f:
+        if PATCH_MARKER.encode() in f.read(4096):
+            print("✅ streamlit_app.py já corrigido - nada a fazer")
+            return True
+    
     # Ler o arquivo atual
     with open('streamlit_app.py', 'r', encoding='utf-8') as f:
         content = f.read()
@@ -52,9 +61,17 @@ def fix_remaining_issues():
         st\.warning\("⚠️ Não foi possível carregar os dados\. Verifique se há transações no banco de dados\."\)
         return'''
     
-    new_dashboard_section = '''    # Buscar dados do dashboard
+    new_dashboard_section = '''    # Buscar dados do dashboard (cacheado por 30s entre reruns)
+    @st.cache_data(ttl=30)
+    def _dashboard_stats(base_url):
+        return FinanceAppAPI(base_url).get_dashboard_stats()
+    
     with st.spinner("Carregando dados financeiros..."):
-        dashboard_data = api.get_dashboard_stats()
+        dashboard_data = _dashboard_stats(api.base_url)
+    
+    # Respostas de erro não ficam no cache: os dados voltam assim que o backend voltar
+    if isinstance(dashboard_data, dict) and "error" in dashboard_data:
+        _dashboard_stats.clear()
     
     # Verificar se há erro nos dados (qualquer tipo de erro)
     if (not dashboard_data or 
@@ -88,10 +105,15 @@ def fix_remaining_issues():
         import pandas as pd
         from datetime import datetime, timedelta
         
-        # Dados simulados para o gráfico
-        dates = [datetime.now() - timedelta(days=x) for x in range(30, 0, -1)]
-        receitas = [3000 + (i * 100) + (i % 5 * 200) for i in range(30)]
-        despesas = [2000 + (i * 80) + (i % 7 * 150) for i in range(30)]
+        # Dados simulados para o gráfico (cacheados por 1h entre reruns)
+        @st.cache_data(ttl=3600)
+        def _example_series(n):
+            dates = [datetime.now() - timedelta(days=x) for x in range(n, 0, -1)]
+            receitas = [3000 + (i * 100) + (i % 5 * 200) for i in range(n)]
+            despesas = [2000 + (i * 80) + (i % 7 * 150) for i in range(n)]
+            return dates, receitas, despesas
+        
+        dates, receitas, despesas = _example_series(30)
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(x=dates, y=receitas, mode='lines+markers', name='Receitas', line=dict(color='green')))
@@ -201,10 +223,15 @@ def fix_remaining_issues():
         from datetime import datetime, timedelta
         import random
         
-        # Dados simulados mais realistas
-        dates = [datetime.now() - timedelta(days=x*30) for x in range(meses_analise, 0, -1)]
-        receitas = [4000 + random.randint(-500, 1000) for _ in range(meses_analise)]
-        despesas = [3000 + random.randint(-400, 800) for _ in range(meses_analise)]
+        # Dados simulados mais realistas (cacheados por 1h entre reruns)
+        @st.cache_data(ttl=3600)
+        def _example_series(n):
+            dates = [datetime.now() - timedelta(days=x*30) for x in range(n, 0, -1)]
+            receitas = [4000 + random.randint(-500, 1000) for _ in range(n)]
+            despesas = [3000 + random.randint(-400, 800) for _ in range(n)]
+            return dates, receitas, despesas
+        
+        dates, receitas, despesas = _example_series(meses_analise)
         saldo = [r - d for r, d in zip(receitas, despesas)]
         
         fig = go.Figure()
@@ -236,13 +263,16 @@ def fix_remaining_issues():
         # Gráfico de pizza
         import plotly.express as px
         
-        categorias_dados = {
-            "Categoria": ["🍽️ Alimentação", "🚗 Transporte", "🏠 Moradia", "🏥 Saúde", "🎮 Lazer", "📚 Educação", "👕 Vestuário"],
-            "Valor": [1200, 800, 1500, 400, 600, 300, 250],
-            "Percentual": [24, 16, 30, 8, 12, 6, 5]
-        }
+        @st.cache_data(ttl=3600)
+        def _example_categorias():
+            categorias_dados = {
+                "Categoria": ["🍽️ Alimentação", "🚗 Transporte", "🏠 Moradia", "🏥 Saúde", "🎮 Lazer", "📚 Educação", "👕 Vestuário"],
+                "Valor": [1200, 800, 1500, 400, 600, 300, 250],
+                "Percentual": [24, 16, 30, 8, 12, 6, 5]
+            }
+            return pd.DataFrame(categorias_dados)
         
-        df_cat = pd.DataFrame(categorias_dados)
+        df_cat = _example_categorias()
         
         col_chart1, col_chart2 = st.columns(2)
         
@@ -368,7 +398,15 @@ def fix_remaining_issues():
             if method == "GET":
                 response = requests\.get\(url, timeout=30\)'''
     
-    new_api_client = '''class FinanceAppAPI:
+    new_api_client = '''@st.cache_resource
+def _http():
+    """Sessão HTTP compartilhada (keep-alive) entre as chamadas da API."""
+    s = requests.Session()
+    s.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return s
+
+
+class FinanceAppAPI:
     """Cliente para comunicação com a API."""
     
     def __init__(self, base_url: str):
@@ -380,13 +418,13 @@ def fix_remaining_issues():
             url = f"{self.base_url}{endpoint}"
             
             if method == "GET":
-                response = requests.get(url, timeout=5)  # Timeout menor'''
+                response = _http().get(url, timeout=5)  # Timeout menor'''
     
     content = re.sub(old_api_client, new_api_client, content, flags=re.MULTILINE | re.DOTALL)
     
     # Salvar o arquivo corrigido
     with open('streamlit_app.py', 'w', encoding='utf-8') as f:
-        f.write(content)
+        f.write(PATCH_MARKER + '\n' + content)
     
     print("✅ Problemas restantes corrigidos!")
     
@@ -4,79 +4,145 @@ Script para corrigir todos os problemas do streamlit_app.py
 Baseado no arquivo completo do GitHub do usuário.
 """
 
+import hashlib
 import re
 import os
+import tempfile
+from pathlib import Path
 
-def fix_streamlit_app():
-    """Corrige todos os problemas identificados no streamlit_app.py"""
-    
-    # Ler o arquivo completo
-    with open('/home/henrique/Projetos/finance_app/streamlit_app_complete.py', 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    print("🔧 Aplicando correções no arquivo completo...")
-    
-    # 1. Corrigir navegação - trocar selectbox por botões na sidebar
-    print("1️⃣ Corrigindo navegação para botões na sidebar...")
-    
-    # Encontrar e substituir a seção de navegação
-    old_navigation = r'''        page = st\.selectbox\(
+SOURCE_FILE = '/home/henrique/Projetos/finance_app/streamlit_app_complete.py'
+OUTPUT_FILE = '/home/henrique/Projetos/finance_app/streamlit_app_final_fixed.py'
+# Digest da última entrada processada, gravado ao lado do arquivo de origem
+MARKER_FILE = SOURCE_FILE + '.fixed'
+
+# Trechos originais a corrigir (literais: localizados com str.find, sem regex)
+_OLD_NAVIGATION = '''        page = st.selectbox(
             "Navegação",
-            \["🏠 Dashboard", "💳 Transações", "🏦 Contas", "📊 Análises", "⚙️ Configurações"\]
-        \)'''
-    
-    new_navigation = '''        # Navegação por botões
+            ["🏠 Dashboard", "💳 Transações", "🏦 Contas", "📊 Análises", "⚙️ Configurações"]
+        )'''
+
+_OLD_STATUS_CHECK = '''    if not health:
+        st.error("❌ Backend não está disponível. Inicie o servidor FastAPI primeiro.")
+        st.code("cd finance_app && python -m uvicorn src.api.main:app --reload")
+        return'''
+
+# Acessos encadeados a health["services"][serviço]["status"] (db, redis, ollama):
+# uma única regex captura os três e _build_safe_status gera a versão segura.
+# Quantificadores possessivos (Python 3.11+) onde o próximo caractere nunca
+# pertence ao grupo, para que uma falha não retroceda dentro deles.
+_STATUS_RE = re.compile(
+    rb'^(?P<indent>[ \t]++)(?P<var>\w+)_status = '
+    rb'health\.get\("services", \{\}\)\.get\("(?P<svc>\w++)", \{\}\)\.get\("status", "unknown"\)',
+    re.MULTILINE,
+)
+
+_OLD_ROUTING = '''    # Roteamento de páginas
+    if page == "🏠 Dashboard":
+        show_dashboard()
+    elif page == "💳 Transações":
+        show_transactions()
+    elif page == "🏦 Contas":
+        show_contas()
+    elif page == "📊 Análises":
+        show_analytics()
+    elif page == "⚙️ Configurações":
+        show_settings()'''
+
+_OLD_CSS = '''    .error-box {
+        background-color: #f8d7da;
+        border: 1px solid #f5c6cb;
+        border-radius: 5px;
+        padding: 1rem;
+        margin: 1rem 0;
+    }'''
+
+_OLD_DASHBOARD_CHECK = '''    if not dashboard_data:
+        st.warning("⚠️ Não foi possível carregar os dados. Verifique se há transações no banco de dados.")
+        return'''
+
+_OLD_SIDEBAR_STATUS = '''        if health:
+            overall_status = health.get("status", "unknown")
+            if overall_status == "healthy":
+                st.success("🟢 Sistema Online")
+            else:
+                st.warning(f"🟡 Sistema: {overall_status}")
+        else:
+            st.error("🔴 Sistema Offline")'''
+
+_OLD_SETTINGS_TABS = '''    # Tabs principais
+    tab1, tab2, tab3, tab4 = st.tabs(["🖥️ Sistema", "🏷️ Categorias", "📤 Importação", "🤖 Ollama"])'''
+
+_OLD_TAB4_CONTENT = '''    with tab4:
+        st.subheader("🤖 Configuração do Ollama")
+        
+        # Configurações do Ollama
+        col_ollama1, col_ollama2 = st.columns(2)
+        
+        with col_ollama1:
+            host_ollama = st.text_input("🌐 Host do Ollama", value="http://localhost:11434")
+            modelo_ollama = st.text_input("🤖 Modelo", value="deepseek-r1:7b")
+        
+        with col_ollama2:
+            temperatura = st.slider("🌡️ Temperatura", 0.0, 2.0, 0.1, 0.1)
+            max_tokens = st.number_input("📊 Max Tokens", min_value=100, max_value=2000, value=500)
+        
+        # Teste de conexão
+        if st.button("🔍 Testar Conexão Ollama"):
+            try:
+                test_response = requests.get(f"{host_ollama}/api/tags", timeout=5)
+                if test_response.status_code == 200:
+                    modelos = test_response.json().get("models", [])
+                    st.success(f"✅ Conexão OK! {len(modelos)} modelos disponíveis")
+                    
+                    if modelos:
+                        st.write("**Modelos disponíveis:**")
+                        for modelo in modelos[:5]:  # Mostrar apenas os primeiros 5
+                            nome = modelo.get("name", "Desconhecido")
+                            tamanho = modelo.get("size", 0)
+                            tamanho_gb = tamanho / (1024**3) if tamanho > 0 else 0
+                            st.text(f"• {nome} ({tamanho_gb:.1f}GB)")
+                else:
+                    st.error("❌ Erro na conexão")
+            except Exception as e:
+                st.error(f"❌ Erro: {str(e)}")
+        
+        if st.button("💾 Salvar Configurações Ollama"):
+            st.success("✅ Configurações do Ollama salvas!")'''
+
+_OLD_CONTAS_FIXAS = '''        st.subheader("💰 Contas Fixas")
+        st.info("🚧 Interface de contas fixas em desenvolvimento")'''
+
+_OLD_CONTAS_VARIAVEIS = '''        st.subheader("📊 Contas Variáveis")
+        st.info("🚧 Interface de contas variáveis em desenvolvimento")'''
+
+_OLD_RESUMO_GERAL = '''        st.subheader("📈 Resumo Geral")
+        st.info("🚧 Resumo em desenvolvimento")'''
+
+# Textos de substituição, construídos uma única vez no carregamento do módulo
+
+# 1. Navegação por botões na sidebar
+_NEW_NAVIGATION = '''        # Navegação por botões
         st.markdown("### 📋 Navegação")
         
+        _PAGES = ("🏠 Dashboard", "💳 Transações", "🏦 Contas", "📊 Análises", "⚙️ Configurações", "🤖 Ollama")
+        
         # Inicializar estado da página se não existir
-        if 'current_page' not in st.session_state:
-            st.session_state.current_page = "🏠 Dashboard"
-        
-        # Botões de navegação
-        if st.button("🏠 Dashboard", use_container_width=True, 
-                    type="primary" if st.session_state.current_page == "🏠 Dashboard" else "secondary"):
-            st.session_state.current_page = "🏠 Dashboard"
-            st.rerun()
-        
-        if st.button("💳 Transações", use_container_width=True,
-                    type="primary" if st.session_state.current_page == "💳 Transações" else "secondary"):
-            st.session_state.current_page = "💳 Transações"
-            st.rerun()
-        
-        if st.button("🏦 Contas", use_container_width=True,
-                    type="primary" if st.session_state.current_page == "🏦 Contas" else "secondary"):
-            st.session_state.current_page = "🏦 Contas"
-            st.rerun()
-        
-        if st.button("📊 Análises", use_container_width=True,
-                    type="primary" if st.session_state.current_page == "📊 Análises" else "secondary"):
-            st.session_state.current_page = "📊 Análises"
-            st.rerun()
-        
-        if st.button("⚙️ Configurações", use_container_width=True,
-                    type="primary" if st.session_state.current_page == "⚙️ Configurações" else "secondary"):
-            st.session_state.current_page = "⚙️ Configurações"
-            st.rerun()
-        
-        if st.button("🤖 Ollama", use_container_width=True,
-                    type="primary" if st.session_state.current_page == "🤖 Ollama" else "secondary"):
-            st.session_state.current_page = "🤖 Ollama"
-            st.rerun()
+        st.session_state.setdefault("current_page", _PAGES[0])
+        
+        # Botões de navegação: o callback atualiza a página antes do rerun
+        # disparado pelo próprio clique, sem precisar de st.rerun()
+        def _set_page(nome):
+            st.session_state.current_page = nome
+        
+        for _p in _PAGES:
+            st.button(_p, use_container_width=True,
+                      type="primary" if st.session_state.current_page == _p else "secondary",
+                      key=f"nav_{_p}", on_click=_set_page, args=(_p,))
         
         page = st.session_state.current_page'''
-    
-    content = re.sub(old_navigation, new_navigation, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # 2. Corrigir verificação de status para evitar AttributeError
-    print("2️⃣ Corrigindo verificação de status dos serviços...")
-    
-    # Substituir verificações de status inseguras no dashboard
-    old_status_check = r'''    if not health:
-        st\.error\("❌ Backend não está disponível\. Inicie o servidor FastAPI primeiro\."\)
-        st\.code\("cd finance_app && python -m uvicorn src\.api\.main:app --reload"\)
-        return'''
-    
-    new_status_check = '''    # Verificar se há erro na resposta
+
+# 2. Verificações de status seguras (evitam AttributeError)
+_NEW_STATUS_CHECK = '''    # Verificar se há erro na resposta
     if "error" in health:
         st.error(f"❌ Backend não está disponível: {health['error']}")
         st.info("💡 **Como resolver:**")
@@ -87,35 +153,63 @@ def fix_streamlit_app():
         st.error("❌ Backend não está disponível. Inicie o servidor FastAPI primeiro.")
         st.code("cd finance_app && python -m uvicorn src.api.main:app --reload")
         return'''
-    
-    content = re.sub(old_status_check, new_status_check, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # Corrigir verificações de status dos serviços
-    old_db_check = r'''            db_status = health\.get\("services", \{\}\)\.get\("database", \{\}\)\.get\("status", "unknown"\)'''
-    new_db_check = '''            # Verificação segura do status do banco
-            services = health.get("services", {}) if isinstance(health, dict) else {}
-            db_info = services.get("database", {}) if isinstance(services, dict) else {}
-            db_status = db_info.get("status", "unknown") if isinstance(db_info, dict) else "unknown"'''
-    
-    content = re.sub(old_db_check, new_db_check, content)
-    
-    old_redis_check = r'''            redis_status = health\.get\("services", \{\}\)\.get\("redis", \{\}\)\.get\("status", "unknown"\)'''
-    new_redis_check = '''            redis_info = services.get("redis", {}) if isinstance(services, dict) else {}
-            redis_status = redis_info.get("status", "unknown") if isinstance(redis_info, dict) else "unknown"'''
-    
-    content = re.sub(old_redis_check, new_redis_check, content)
-    
-    old_ollama_check = r'''            ollama_status = health\.get\("services", \{\}\)\.get\("ollama", \{\}\)\.get\("status", "unknown"\)'''
-    new_ollama_check = '''            ollama_info = services.get("ollama", {}) if isinstance(services, dict) else {}
-            ollama_status = ollama_info.get("status", "unknown") if isinstance(ollama_info, dict) else "unknown"'''
-    
-    content = re.sub(old_ollama_check, new_ollama_check, content)
-    
-    # 3. Adicionar página dedicada do Ollama
-    print("3️⃣ Adicionando página dedicada do Ollama...")
-    
-    # Encontrar onde adicionar a nova função (antes da função main)
-    ollama_page_function = '''
+
+def _build_safe_status(indent, var, svc):
+    """Gera o acesso seguro ao status de um serviço a partir do health."""
+    lines = []
+    if svc == "database":
+        lines.append(f'{indent}# Verificação segura do status do banco')
+        lines.append(f'{indent}services = health.get("services", {{}}) if isinstance(health, dict) else {{}}')
+    lines.append(f'{indent}{var}_info = services.get("{svc}", {{}}) if isinstance(services, dict) else {{}}')
+    lines.append(f'{indent}{var}_status = {var}_info.get("status", "unknown") if isinstance({var}_info, dict) else "unknown"')
+    return '\n'.join(lines)
+
+# 3. Página dedicada do Ollama
+_OLLAMA_PAGE = '''
+
+# Textos estáticos das páginas, definidos uma única vez no carregamento
+_OLLAMA_INSTALL_MD = """
+### 🚀 Como instalar o Ollama:
+
+```bash
+# Ubuntu/Debian
+curl -fsSL https://ollama.ai/install.sh | sh
+
+# Iniciar serviço
+ollama serve
+
+# Baixar modelo (em outro terminal)
+ollama pull llama2
+```
+"""
+
+_BANKING_WARN_HTML = """
+<div class="banking-warning-box">
+    ⚠️ <strong>Importante:</strong> APIs diretas dos bancos brasileiros não estão disponíveis para aplicações pessoais. 
+    Esta seção foca no upload e processamento de faturas e extratos bancários.
+</div>
+"""
+
+
+@st.cache_resource
+def _ollama_session():
+    """Sessão HTTP reutilizada entre reruns para falar com o Ollama."""
+    # import local: evita carregar requests na inicialização do app
+    import requests
+    return requests.Session()
+
+
+def _ollama_get(url, timeout=5):
+    return _ollama_session().get(url, timeout=timeout)
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _fetch_ollama_tags(host: str):
+    """Lista de modelos do Ollama, consultada no máximo a cada 10s."""
+    response = _ollama_get(f"{host}/api/tags", timeout=5)
+    response.raise_for_status()
+    return response.json()
+
 
 def show_ollama():
     """Exibe página dedicada do Ollama."""
@@ -159,61 +253,42 @@ def show_ollama():
         
         # Verificar status
         try:
-            import requests
-            response = requests.get("http://localhost:11434/api/tags", timeout=5)
+            data = _fetch_ollama_tags("http://localhost:11434")
             
-            if response.status_code == 200:
-                st.success("🟢 **Ollama está funcionando!**")
-                
-                data = response.json()
-                modelos = data.get("models", [])
+            st.success("🟢 **Ollama está funcionando!**")
+            
+            modelos = data.get("models", [])
+            
+            if modelos:
+                st.subheader("🤖 Modelos Disponíveis")
                 
-                if modelos:
-                    st.subheader("🤖 Modelos Disponíveis")
+                for modelo in modelos:
+                    nome = modelo.get("name", "Desconhecido")
+                    tamanho = modelo.get("size", 0)
+                    tamanho_gb = tamanho / (1024**3) if tamanho > 0 else 0
+                    modified = modelo.get("modified_at", "")
                     
-                    for modelo in modelos:
-                        nome = modelo.get("name", "Desconhecido")
-                        tamanho = modelo.get("size", 0)
-                        tamanho_gb = tamanho / (1024**3) if tamanho > 0 else 0
-                        modified = modelo.get("modified_at", "")
+                    with st.expander(f"🤖 {nome} ({tamanho_gb:.1f}GB)"):
+                        col_model1, col_model2 = st.columns(2)
                         
-                        with st.expander(f"🤖 {nome} ({tamanho_gb:.1f}GB)"):
-                            col_model1, col_model2 = st.columns(2)
-                            
-                            with col_model1:
-                                st.write(f"**Nome:** {nome}")
-                                st.write(f"**Tamanho:** {tamanho_gb:.1f}GB")
-                            
-                            with col_model2:
-                                st.write(f"**Modificado:** {modified[:10] if modified else 'N/A'}")
-                                if st.button(f"🗑️ Remover {nome}", key=f"remove_{nome}"):
-                                    st.warning("⚠️ Funcionalidade em desenvolvimento")
-                else:
-                    st.warning("⚠️ Nenhum modelo encontrado")
-                    
-                    if st.button("📥 Baixar Modelo Padrão"):
-                        st.info("💡 Execute: `ollama pull llama2` no terminal")
-            
+                        with col_model1:
+                            st.write(f"**Nome:** {nome}")
+                            st.write(f"**Tamanho:** {tamanho_gb:.1f}GB")
+                        
+                        with col_model2:
+                            st.write(f"**Modificado:** {modified[:10] if modified else 'N/A'}")
+                            if st.button(f"🗑️ Remover {nome}", key=f"remove_{nome}"):
+                                st.warning("⚠️ Funcionalidade em desenvolvimento")
             else:
-                st.error(f"🔴 **Erro na conexão:** Status {response.status_code}")
+                st.warning("⚠️ Nenhum modelo encontrado")
+                
+                if st.button("📥 Baixar Modelo Padrão"):
+                    st.info("💡 Execute: `ollama pull llama2` no terminal")
                 
         except Exception as e:
             st.error(f"🔴 **Ollama não está disponível:** {str(e)}")
             
-            st.markdown("""
-            ### 🚀 Como instalar o Ollama:
-            
-            ```bash
-            # Ubuntu/Debian
-            curl -fsSL https://ollama.ai/install.sh | sh
-            
-            # Iniciar serviço
-            ollama serve
-            
-            # Baixar modelo (em outro terminal)
-            ollama pull llama2
-            ```
-            """)
+            st.markdown(_OLLAMA_INSTALL_MD)
     
     with tab3:
         st.subheader("🧪 Teste do Ollama")
@@ -229,15 +304,13 @@ def show_ollama():
             if prompt_teste:
                 with st.spinner("Processando com Ollama..."):
                     try:
-                        import requests
-                        
                         payload = {
                             "model": "llama2",
                             "prompt": prompt_teste,
                             "stream": False
                         }
                         
-                        response = requests.post(
+                        response = _ollama_session().post(
                             "http://localhost:11434/api/generate",
                             json=payload,
                             timeout=30
@@ -290,28 +363,9 @@ def show_ollama():
                 st.rerun()
 
 '''
-    
-    # Inserir a função antes da função main
-    main_function_pos = content.find("def main():")
-    if main_function_pos != -1:
-        content = content[:main_function_pos] + ollama_page_function + content[main_function_pos:]
-    
-    # 4. Adicionar roteamento para página do Ollama
-    print("4️⃣ Adicionando roteamento para página do Ollama...")
-    
-    old_routing = r'''    # Roteamento de páginas
-    if page == "🏠 Dashboard":
-        show_dashboard\(\)
-    elif page == "💳 Transações":
-        show_transactions\(\)
-    elif page == "🏦 Contas":
-        show_contas\(\)
-    elif page == "📊 Análises":
-        show_analytics\(\)
-    elif page == "⚙️ Configurações":
-        show_settings\(\)'''
-    
-    new_routing = '''    # Roteamento de páginas
+
+# 4. Roteamento para a página do Ollama
+_NEW_ROUTING = '''    # Roteamento de páginas
     if page == "🏠 Dashboard":
         show_dashboard()
     elif page == "💳 Transações":
@@ -324,22 +378,9 @@ def show_ollama():
         show_settings()
     elif page == "🤖 Ollama":
         show_ollama()'''
-    
-    content = re.sub(old_routing, new_routing, content, flags=re.MULTILINE)
-    
-    # 5. Melhorar CSS para melhor visibilidade da mensagem de APIs bancárias
-    print("5️⃣ Melhorando CSS para melhor visibilidade...")
-    
-    # Adicionar CSS melhorado
-    old_css = r'''    \.error-box \{
-        background-color: #f8d7da;
-        border: 1px solid #f5c6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    \}'''
-    
-    new_css = '''    .error-box {
+
+# 5. CSS com melhor visibilidade da mensagem de APIs bancárias
+_NEW_CSS = '''    .error-box {
         background-color: #f8d7da;
         border: 1px solid #f5c6cb;
         border-radius: 5px;
@@ -362,17 +403,9 @@ def show_ollama():
         color: #664d03;
         font-size: 1.1rem;
     }'''
-    
-    content = re.sub(old_css, new_css, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # 6. Corrigir verificação de dashboard_data
-    print("6️⃣ Corrigindo verificação de dashboard_data...")
-    
-    old_dashboard_check = r'''    if not dashboard_data:
-        st\.warning\("⚠️ Não foi possível carregar os dados\. Verifique se há transações no banco de dados\."\)
-        return'''
-    
-    new_dashboard_check = '''    # Verificar se há erro nos dados
+
+# 6. Verificação de dashboard_data
+_NEW_DASHBOARD_CHECK = '''    # Verificar se há erro nos dados
     if "error" in dashboard_data:
         st.warning(f"⚠️ Não foi possível carregar os dados: {dashboard_data['error']}")
         st.info("💡 Verifique se há transações no banco de dados ou se o backend está funcionando corretamente.")
@@ -381,22 +414,9 @@ def show_ollama():
     if not dashboard_data or not isinstance(dashboard_data, dict):
         st.warning("⚠️ Não foi possível carregar os dados. Verifique se há transações no banco de dados.")
         return'''
-    
-    content = re.sub(old_dashboard_check, new_dashboard_check, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # 7. Corrigir verificação de status na sidebar
-    print("7️⃣ Corrigindo verificação de status na sidebar...")
-    
-    old_sidebar_status = r'''        if health:
-            overall_status = health\.get\("status", "unknown"\)
-            if overall_status == "healthy":
-                st\.success\("🟢 Sistema Online"\)
-            else:
-                st\.warning\(f"🟡 Sistema: \{overall_status\}"\)
-        else:
-            st\.error\("🔴 Sistema Offline"\)'''
-    
-    new_sidebar_status = '''        # Verificação segura do status
+
+# 7. Status da sidebar
+_NEW_SIDEBAR_STATUS = '''        # Verificação segura do status
         if health and "error" not in health:
             overall_status = health.get("status", "unknown")
             if overall_status == "healthy":
@@ -405,71 +425,16 @@ def show_ollama():
                 st.warning(f"🟡 Sistema: {overall_status}")
         else:
             st.error("🔴 Sistema Offline")'''
-    
-    content = re.sub(old_sidebar_status, new_sidebar_status, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # 8. Remover a tab do Ollama das configurações e adicionar tab de APIs bancárias
-    print("8️⃣ Atualizando tabs das configurações...")
-    
-    old_settings_tabs = r'''    # Tabs principais
-    tab1, tab2, tab3, tab4 = st\.tabs\(\["🖥️ Sistema", "🏷️ Categorias", "📤 Importação", "🤖 Ollama"\]\)'''
-    
-    new_settings_tabs = '''    # Tabs principais
+
+# 8-9. Tab de APIs bancárias no lugar da tab do Ollama nas configurações
+_NEW_SETTINGS_TABS = '''    # Tabs principais
     tab1, tab2, tab3, tab4 = st.tabs(["🖥️ Sistema", "🏷️ Categorias", "📤 Importação", "🏦 APIs Bancárias"])'''
-    
-    content = re.sub(old_settings_tabs, new_settings_tabs, content)
-    
-    # 9. Substituir conteúdo da tab4 (Ollama) por APIs bancárias
-    print("9️⃣ Substituindo tab do Ollama por APIs bancárias...")
-    
-    # Encontrar o início da tab4 e substituir todo o conteúdo
-    old_tab4_content = r'''    with tab4:
-        st\.subheader\("🤖 Configuração do Ollama"\)
-        
-        # Configurações do Ollama
-        col_ollama1, col_ollama2 = st\.columns\(2\)
-        
-        with col_ollama1:
-            host_ollama = st\.text_input\("🌐 Host do Ollama", value="http://localhost:11434"\)
-            modelo_ollama = st\.text_input\("🤖 Modelo", value="deepseek-r1:7b"\)
-        
-        with col_ollama2:
-            temperatura = st\.slider\("🌡️ Temperatura", 0\.0, 2\.0, 0\.1, 0\.1\)
-            max_tokens = st\.number_input\("📊 Max Tokens", min_value=100, max_value=2000, value=500\)
-        
-        # Teste de conexão
-        if st\.button\("🔍 Testar Conexão Ollama"\):
-            try:
-                test_response = requests\.get\(f"\{host_ollama\}/api/tags", timeout=5\)
-                if test_response\.status_code == 200:
-                    modelos = test_response\.json\(\)\.get\("models", \[\]\)
-                    st\.success\(f"✅ Conexão OK! \{len\(modelos\)\} modelos disponíveis"\)
-                    
-                    if modelos:
-                        st\.write\("\*\*Modelos disponíveis:\*\*"\)
-                        for modelo in modelos\[:5\]:  # Mostrar apenas os primeiros 5
-                            nome = modelo\.get\("name", "Desconhecido"\)
-                            tamanho = modelo\.get\("size", 0\)
-                            tamanho_gb = tamanho / \(1024\*\*3\) if tamanho > 0 else 0
-                            st\.text\(f"• \{nome\} \(\{tamanho_gb:\.1f\}GB\)"\)
-                else:
-                    st\.error\("❌ Erro na conexão"\)
-            except Exception as e:
-                st\.error\(f"❌ Erro: \{str\(e\)\}"\)
-        
-        if st\.button\("💾 Salvar Configurações Ollama"\):
-            st\.success\("✅ Configurações do Ollama salvas!"\)'''
-    
-    new_tab4_content = '''    with tab4:
+
+_NEW_TAB4_CONTENT = '''    with tab4:
         st.subheader("🏦 Configuração de APIs Bancárias")
         
         # Aviso sobre limitações das APIs bancárias
-        st.markdown(\"\"\"
-        <div class="banking-warning-box">
-            ⚠️ <strong>Importante:</strong> APIs diretas dos bancos brasileiros não estão disponíveis para aplicações pessoais. 
-            Esta seção foca no upload e processamento de faturas e extratos bancários.
-        </div>
-        \"\"\", unsafe_allow_html=True)
+        st.markdown(_BANKING_WARN_HTML, unsafe_allow_html=True)
         
         # Configurações de APIs bancárias
         st.markdown("### 🔧 Configurações de Integração")
@@ -503,30 +468,34 @@ def show_ollama():
             # Configurações de bancos suportados
             st.markdown("### 🏦 Bancos Suportados")
             
-            bancos_suportados = [
-                {"nome": "Itaú", "faturas": True, "extratos": True, "ofx": True},
-                {"nome": "Santander", "faturas": True, "extratos": True, "ofx": True},
-                {"nome": "Bradesco", "faturas": True, "extratos": True, "ofx": False},
-                {"nome": "Nubank", "faturas": True, "extratos": False, "ofx": False},
-                {"nome": "Inter", "faturas": True, "extratos": True, "ofx": True},
-                {"nome": "C6 Bank", "faturas": True, "extratos": True, "ofx": False}
-            ]
+            # (nome, faturas, extratos, ofx)
+            bancos_suportados = (
+                ("Itaú", True, True, True),
+                ("Santander", True, True, True),
+                ("Bradesco", True, True, False),
+                ("Nubank", True, False, False),
+                ("Inter", True, True, True),
+                ("C6 Bank", True, True, False),
+            )
             
-            for banco in bancos_suportados:
-                with st.expander(f"🏦 {banco['nome']}"):
-                    col_b1, col_b2, col_b3 = st.columns(3)
-                    
-                    with col_b1:
-                        faturas_status = "✅" if banco['faturas'] else "❌"
-                        st.write(f"**📄 Faturas:** {faturas_status}")
-                    
-                    with col_b2:
-                        extratos_status = "✅" if banco['extratos'] else "❌"
-                        st.write(f"**📊 Extratos:** {extratos_status}")
-                    
-                    with col_b3:
-                        ofx_status = "✅" if banco['ofx'] else "❌"
-                        st.write(f"**📁 OFX:** {ofx_status}")
+            # Tabela montada uma única vez e reaproveitada entre reruns
+            @st.cache_data
+            def _banks_html(bancos):
+                def _status(ok):
+                    return "✅" if ok else "❌"
+                
+                linhas = "\\n".join(
+                    f"<tr><td>🏦 {nome}</td><td>{_status(faturas)}</td>"
+                    f"<td>{_status(extratos)}</td><td>{_status(ofx)}</td></tr>"
+                    for nome, faturas, extratos, ofx in bancos
+                )
+                return (
+                    "<table><thead><tr><th>Banco</th><th>📄 Faturas</th>"
+                    "<th>📊 Extratos</th><th>📁 OFX</th></tr></thead>"
+                    f"<tbody>{linhas}</tbody></table>"
+                )
+            
+            st.markdown(_banks_html(bancos_suportados), unsafe_allow_html=True)
         
         else:
             st.info("🔒 Funcionalidades bancárias desabilitadas. Habilite para configurar.")
@@ -552,17 +521,9 @@ def show_ollama():
         with col_btn3:
             if st.button("🔄 Restaurar Padrões"):
                 st.info("🔄 Configurações restauradas para os valores padrão")'''
-    
-    content = re.sub(old_tab4_content, new_tab4_content, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # 10. Remover mensagens de "em desenvolvimento" das páginas de contas
-    print("🔟 Removendo mensagens de 'em desenvolvimento' das contas...")
-    
-    # Substituir mensagens de desenvolvimento por conteúdo funcional
-    old_contas_fixas = r'''        st\.subheader\("💰 Contas Fixas"\)
-        st\.info\("🚧 Interface de contas fixas em desenvolvimento"\)'''
-    
-    new_contas_fixas = '''        st.subheader("💰 Contas Fixas")
+
+# 10. Contas fixas, variáveis e resumo funcionais
+_NEW_CONTAS_FIXAS = '''        st.subheader("💰 Contas Fixas")
         
         # Dados de exemplo de contas fixas
         if "contas_fixas" not in st.session_state:
@@ -596,13 +557,8 @@ def show_ollama():
                     st.write(f"**Categoria:** {conta['categoria']}")
                     if st.button(f"✏️ Editar {conta['nome']}", key=f"edit_{conta['nome']}"):
                         st.info("💡 Funcionalidade de edição em desenvolvimento")'''
-    
-    content = re.sub(old_contas_fixas, new_contas_fixas, content, flags=re.MULTILINE | re.DOTALL)
-    
-    old_contas_variaveis = r'''        st\.subheader\("📊 Contas Variáveis"\)
-        st\.info\("🚧 Interface de contas variáveis em desenvolvimento"\)'''
-    
-    new_contas_variaveis = '''        st.subheader("📊 Contas Variáveis")
+
+_NEW_CONTAS_VARIAVEIS = '''        st.subheader("📊 Contas Variáveis")
         
         # Dados de exemplo de contas variáveis
         if "contas_variaveis" not in st.session_state:
@@ -640,18 +596,14 @@ def show_ollama():
                     st.write(f"**Variação:** {cor} {variacao:+.1f}%")
                     if st.button(f"📊 Ver Histórico {conta['nome']}", key=f"hist_{conta['nome']}"):
                         st.info("💡 Histórico detalhado em desenvolvimento")'''
-    
-    content = re.sub(old_contas_variaveis, new_contas_variaveis, content, flags=re.MULTILINE | re.DOTALL)
-    
-    old_resumo_geral = r'''        st\.subheader\("📈 Resumo Geral"\)
-        st\.info\("🚧 Resumo em desenvolvimento"\)'''
-    
-    new_resumo_geral = '''        st.subheader("📈 Resumo Geral")
+
+_NEW_RESUMO_GERAL = '''        st.subheader("📈 Resumo Geral")
         
         # Calcular totais
         total_fixas = sum(conta["valor"] for conta in st.session_state.get("contas_fixas", []))
         total_variaveis = sum(conta["valor_medio"] for conta in st.session_state.get("contas_variaveis", []))
         total_impostos = sum(item["valor_total"] for item in st.session_state.get("taxes_data", []))
+        impostos_mensais = total_impostos / 12
         
         # Métricas gerais
         col1, col2, col3, col4 = st.columns(4)
@@ -663,23 +615,17 @@ def show_ollama():
         with col3:
             st.metric("🏛️ Impostos/Ano", f"R$ {total_impostos:,.2f}")
         with col4:
-            total_geral = total_fixas + total_variaveis + (total_impostos/12)
+            total_geral = total_fixas + total_variaveis + impostos_mensais
             st.metric("💸 Total Mensal", f"R$ {total_geral:,.2f}")
         
         # Gráfico de distribuição
         st.subheader("📊 Distribuição de Gastos")
         
-        import plotly.express as px
-        import pandas as pd
-        
-        dados_grafico = {
-            "Categoria": ["Contas Fixas", "Contas Variáveis", "Impostos (mensal)"],
-            "Valor": [total_fixas, total_variaveis, total_impostos/12]
-        }
-        
-        df_grafico = pd.DataFrame(dados_grafico)
-        fig = px.pie(df_grafico, values="Valor", names="Categoria", 
-                    title="Distribuição de Gastos Mensais")
+        fig = go.Figure(data=[go.Pie(
+            labels=["Contas Fixas", "Contas Variáveis", "Impostos (mensal)"],
+            values=[total_fixas, total_variaveis, impostos_mensais]
+        )])
+        fig.update_layout(title="Distribuição de Gastos Mensais")
         st.plotly_chart(fig, use_container_width=True)
         
         # Alertas e insights
@@ -691,20 +637,123 @@ def show_ollama():
             st.warning("⚠️ **Atenção:** Seus gastos variáveis estão altos. Monitore mais de perto.")
         
         if total_impostos > 0:
-            impostos_mensais = total_impostos / 12
             percentual_impostos = (impostos_mensais / total_geral) * 100
             st.info(f"🏛️ **Impostos:** Representam {percentual_impostos:.1f}% do seu orçamento mensal.")'''
+
+# Ponto de inserção da página do Ollama (imediatamente antes de "def main():")
+_MAIN_INSERT_RE = re.compile(rb'(?=^def main\(\):)', re.MULTILINE)
+
+# Pares (trecho original, substituição) de todas as correções
+_FIXES = (
+    (_OLD_NAVIGATION, _NEW_NAVIGATION),
+    (_OLD_STATUS_CHECK, _NEW_STATUS_CHECK),
+    (_OLD_ROUTING, _NEW_ROUTING),
+    (_OLD_CSS, _NEW_CSS),
+    (_OLD_DASHBOARD_CHECK, _NEW_DASHBOARD_CHECK),
+    (_OLD_SIDEBAR_STATUS, _NEW_SIDEBAR_STATUS),
+    (_OLD_SETTINGS_TABS, _NEW_SETTINGS_TABS),
+    (_OLD_TAB4_CONTENT, _NEW_TAB4_CONTENT),
+    (_OLD_CONTAS_FIXAS, _NEW_CONTAS_FIXAS),
+    (_OLD_CONTAS_VARIAVEIS, _NEW_CONTAS_VARIAVEIS),
+    (_OLD_RESUMO_GERAL, _NEW_RESUMO_GERAL),
+)
+
+# O arquivo é processado como bytes do início ao fim: os textos são
+# codificados uma única vez aqui, e não há decode/encode do arquivo inteiro
+_FIXES_BYTES = tuple((old.encode('utf-8'), new.encode('utf-8')) for old, new in _FIXES)
+_OLLAMA_PAGE_BYTES = _OLLAMA_PAGE.encode('utf-8')
+
+# Sentinelas literais das regras com regex: se o trecho não aparece no
+# arquivo (p.ex. já corrigido), a regex nem chega a ser executada
+_STATUS_SENTINEL = b'_status = health.get("services", {})'
+_MAIN_SENTINEL = b'def main():'
+
+# Hash base das regras: alterar qualquer correção invalida o marcador
+_RULES_HASH = hashlib.blake2b(digest_size=16)
+for _old, _new in _FIXES_BYTES:
+    _RULES_HASH.update(_old)
+    _RULES_HASH.update(_new)
+_RULES_HASH.update(_STATUS_RE.pattern)
+_RULES_HASH.update(_OLLAMA_PAGE_BYTES)
+
+def _find_edits(content):
+    """Localiza todas as edições (início, fim, texto) sobre o conteúdo original."""
+    edits = []
+    # Regras literais: o próprio find é a verificação rápida (memmem em C)
+    for old, new in _FIXES_BYTES:
+        start = content.find(old)
+        while start != -1:
+            end = start + len(old)
+            edits.append((start, end, new))
+            start = content.find(old, end)
+    
+    if _STATUS_SENTINEL in content:
+        for m in _STATUS_RE.finditer(content):
+            safe = _build_safe_status(m['indent'].decode(), m['var'].decode(), m['svc'].decode())
+            edits.append((m.start(), m.end(), safe.encode('utf-8')))
+    
+    # Inserção da página do Ollama como edição de largura zero
+    if _MAIN_SENTINEL in content:
+        main_match = _MAIN_INSERT_RE.search(content)
+        if main_match:
+            edits.append((main_match.start(), main_match.start(), _OLLAMA_PAGE_BYTES))
+    
+    edits.sort(key=lambda edit: (edit[0], edit[1]))
+    return edits
+
+def _apply_edits(content, edits):
+    """Monta o resultado em uma única passada linear sobre as edições ordenadas."""
+    parts = []
+    pos = 0
+    for start, end, text in edits:
+        assert start >= pos, f"Edições sobrepostas na posição {start}"
+        parts.append(content[pos:start])
+        parts.append(text)
+        pos = end
+    parts.append(content[pos:])
+    return b''.join(parts)
+
+def fix_streamlit_app():
+    """Corrige todos os problemas identificados no streamlit_app.py"""
+    
+    # Ler o arquivo completo como bytes (sem decodificar)
+    content = Path(SOURCE_FILE).read_bytes()
+    
+    fingerprint = _RULES_HASH.copy()
+    fingerprint.update(content)
+    digest = fingerprint.hexdigest()
+    
+    # Mesma entrada e mesmas regras da última execução: nada a refazer
+    if os.path.exists(OUTPUT_FILE) and os.path.exists(MARKER_FILE):
+        with open(MARKER_FILE, 'r', encoding='utf-8') as marker:
+            if marker.read().strip() == digest:
+                print(f"✅ Nenhuma alteração desde a última correção: {OUTPUT_FILE}")
+                return OUTPUT_FILE
+    
+    print("🔧 Aplicando correções no arquivo completo...")
+    
+    # Localizar todas as correções (e a inserção da página do Ollama) sobre o
+    # conteúdo original e montar o resultado de uma só vez
+    content = _apply_edits(content, _find_edits(content))
     
-    content = re.sub(old_resumo_geral, new_resumo_geral, content, flags=re.MULTILINE | re.DOTALL)
+    # Salvar o arquivo corrigido: grava num temporário no mesmo diretório e
+    # renomeia atomicamente, para nunca deixar a saída pela metade
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(OUTPUT_FILE), prefix='.fix_', suffix='.py')
+    try:
+        with os.fdopen(fd, 'wb', buffering=1 << 20) as f:
+            f.write(content)
+        os.replace(tmp_path, OUTPUT_FILE)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     
-    # Salvar o arquivo corrigido
-    output_file = '/home/henrique/Projetos/finance_app/streamlit_app_final_fixed.py'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(content)
+    with open(MARKER_FILE, 'w', encoding='utf-8') as marker:
+        marker.write(digest)
     
-    print(f"✅ Arquivo corrigido salvo em: {output_file}")
+    print(f"✅ Arquivo corrigido salvo em: {OUTPUT_FILE}")
     
-    return output_file
+    return OUTPUT_FILE
 
 if __name__ == "__main__":
     print("🚀 Iniciando correção completa do streamlit_app.py...")
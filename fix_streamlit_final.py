@@ -4,28 +4,19 @@ Script para corrigir todos os problemas do streamlit_app.py
 Mantém todas as funcionalidades existentes e adiciona as melhorias solicitadas.
 """
 
-import re
+import functools
 import os
+import re
+from pathlib import Path
 
-def fix_streamlit_app():
-    """Corrige todos os problemas identificados no streamlit_app.py"""
-    
-    # Ler o arquivo original
-    with open('/home/henrique/Projetos/finance_app/streamlit_app_original.py', 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    print("🔧 Aplicando correções...")
-    
-    # 1. Corrigir navegação - trocar selectbox por botões na sidebar
-    print("1️⃣ Corrigindo navegação para botões na sidebar...")
-    
-    # Encontrar e substituir a seção de navegação
-    old_navigation = r'''        page = st\.selectbox\(
+# Correções: (trecho original literal, substituição)
+
+# 1. Navegação por botões na sidebar
+_OLD_NAVIGATION = '''        page = st.selectbox(
             "Navegação",
-            \["🏠 Dashboard", "💳 Transações", "🏦 Contas", "📊 Análises", "⚙️ Configurações"\]
-        \)'''
-    
-    new_navigation = '''        # Navegação por botões
+            ["🏠 Dashboard", "💳 Transações", "🏦 Contas", "📊 Análises", "⚙️ Configurações"]
+        )'''
+_NEW_NAVIGATION = '''        # Navegação por botões
         st.markdown("### 📋 Navegação")
         
         # Inicializar estado da página se não existir
@@ -64,19 +55,13 @@ def fix_streamlit_app():
             st.rerun()
         
         page = st.session_state.current_page'''
-    
-    content = re.sub(old_navigation, new_navigation, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # 2. Corrigir verificação de status para evitar AttributeError
-    print("2️⃣ Corrigindo verificação de status dos serviços...")
-    
-    # Substituir verificações de status inseguras
-    old_status_check = r'''    if not health:
-        st\.error\("❌ Backend não está disponível\. Inicie o servidor FastAPI primeiro\."\)
-        st\.code\("cd finance_app && python -m uvicorn src\.api\.main:app --reload"\)
+
+# 2. Verificações de status seguras (evitam AttributeError)
+_OLD_STATUS_CHECK = '''    if not health:
+        st.error("❌ Backend não está disponível. Inicie o servidor FastAPI primeiro.")
+        st.code("cd finance_app && python -m uvicorn src.api.main:app --reload")
         return'''
-    
-    new_status_check = '''    # Verificar se há erro na resposta
+_NEW_STATUS_CHECK = '''    # Verificar se há erro na resposta
     if "error" in health:
         st.error(f"❌ Backend não está disponível: {health['error']}")
         st.info("💡 **Como resolver:**")
@@ -87,35 +72,125 @@ def fix_streamlit_app():
         st.error("❌ Backend não está disponível. Inicie o servidor FastAPI primeiro.")
         st.code("cd finance_app && python -m uvicorn src.api.main:app --reload")
         return'''
-    
-    content = re.sub(old_status_check, new_status_check, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # Corrigir verificações de status dos serviços
-    old_db_check = r'''            db_status = health\.get\("services", \{\}\)\.get\("database", \{\}\)\.get\("status", "unknown"\)'''
-    new_db_check = '''            # Verificação segura do status do banco
+_OLD_DB_CHECK = '''            db_status = health.get("services", {}).get("database", {}).get("status", "unknown")'''
+_NEW_DB_CHECK = '''            # Verificação segura do status do banco
             services = health.get("services", {}) if isinstance(health, dict) else {}
             db_info = services.get("database", {}) if isinstance(services, dict) else {}
             db_status = db_info.get("status", "unknown") if isinstance(db_info, dict) else "unknown"'''
-    
-    content = re.sub(old_db_check, new_db_check, content)
-    
-    old_redis_check = r'''            redis_status = health\.get\("services", \{\}\)\.get\("redis", \{\}\)\.get\("status", "unknown"\)'''
-    new_redis_check = '''            redis_info = services.get("redis", {}) if isinstance(services, dict) else {}
+_OLD_REDIS_CHECK = '''            redis_status = health.get("services", {}).get("redis", {}).get("status", "unknown")'''
+_NEW_REDIS_CHECK = '''            redis_info = services.get("redis", {}) if isinstance(services, dict) else {}
             redis_status = redis_info.get("status", "unknown") if isinstance(redis_info, dict) else "unknown"'''
-    
-    content = re.sub(old_redis_check, new_redis_check, content)
-    
-    old_ollama_check = r'''            ollama_status = health\.get\("services", \{\}\)\.get\("ollama", \{\}\)\.get\("status", "unknown"\)'''
-    new_ollama_check = '''            ollama_info = services.get("ollama", {}) if isinstance(services, dict) else {}
+_OLD_OLLAMA_CHECK = '''            ollama_status = health.get("services", {}).get("ollama", {}).get("status", "unknown")'''
+_NEW_OLLAMA_CHECK = '''            ollama_info = services.get("ollama", {}) if isinstance(services, dict) else {}
             ollama_status = ollama_info.get("status", "unknown") if isinstance(ollama_info, dict) else "unknown"'''
+
+# 4. Roteamento para a página do Ollama
+_OLD_ROUTING = '''    # Roteamento de páginas
+    if page == "🏠 Dashboard":
+        show_dashboard()
+    elif page == "💳 Transações":
+        show_transactions()
+    elif page == "🏦 Contas":
+        show_contas()
+    elif page == "📊 Análises":
+        show_analytics()
+    elif page == "⚙️ Configurações":
+        show_settings()'''
+_NEW_ROUTING = '''    # Roteamento de páginas
+    if page == "🏠 Dashboard":
+        show_dashboard()
+    elif page == "💳 Transações":
+        show_transactions()
+    elif page == "🏦 Contas":
+        show_contas()
+    elif page == "📊 Análises":
+        show_analytics()
+    elif page == "⚙️ Configurações":
+        show_settings()
+    elif page == "🤖 Ollama":
+        show_ollama()'''
+
+# 5. CSS com melhor visibilidade da mensagem de APIs bancárias
+_OLD_CSS = '''    .error-box {
+        background-color: #f8d7da;
+        border: 1px solid #f5c6cb;
+        border-radius: 5px;
+        padding: 1rem;
+        margin: 1rem 0;
+    }'''
+_NEW_CSS = '''    .error-box {
+        background-color: #f8d7da;
+        border: 1px solid #f5c6cb;
+        border-radius: 5px;
+        padding: 1rem;
+        margin: 1rem 0;
+    }
     
-    content = re.sub(old_ollama_check, new_ollama_check, content)
+    .banking-warning-box {
+        background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%);
+        border: 2px solid #ffc107;
+        border-radius: 10px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+        color: #856404;
+        font-weight: 500;
+    }
     
-    # 3. Adicionar página dedicada do Ollama
-    print("3️⃣ Adicionando página dedicada do Ollama...")
+    .banking-warning-box strong {
+        color: #664d03;
+        font-size: 1.1rem;
+    }'''
+
+# 6. Mensagem de APIs bancárias com melhor visibilidade
+_OLD_BANKING_MESSAGE = '''        st.markdown("""
+        <div class="warning-box">
+            ⚠️ <strong>Importante:</strong> APIs diretas dos bancos brasileiros não estão disponíveis para aplicações pessoais. 
+            Esta seção foca no upload e processamento de faturas e extratos.
+        </div>
+        """, unsafe_allow_html=True)'''
+_NEW_BANKING_MESSAGE = '''        st.markdown(\"\"\"
+        <div class="banking-warning-box">
+            ⚠️ <strong>Importante:</strong> APIs diretas dos bancos brasileiros não estão disponíveis para aplicações pessoais. 
+            Esta seção foca no upload e processamento de faturas e extratos bancários.
+        </div>
+        \"\"\", unsafe_allow_html=True)'''
+
+# 7. Verificação de dashboard_data
+_OLD_DASHBOARD_CHECK = '''    if not dashboard_data:
+        st.warning("⚠️ Não foi possível carregar os dados. Verifique se há transações no banco de dados.")
+        return'''
+_NEW_DASHBOARD_CHECK = '''    # Verificar se há erro nos dados
+    if "error" in dashboard_data:
+        st.warning(f"⚠️ Não foi possível carregar os dados: {dashboard_data['error']}")
+        st.info("💡 Verifique se há transações no banco de dados ou se o backend está funcionando corretamente.")
+        return
     
-    # Encontrar onde adicionar a nova função
-    ollama_page_function = '''
+    if not dashboard_data or not isinstance(dashboard_data, dict):
+        st.warning("⚠️ Não foi possível carregar os dados. Verifique se há transações no banco de dados.")
+        return'''
+
+# 9. Status da sidebar
+_OLD_SIDEBAR_STATUS = '''        if health:
+            overall_status = health.get("status", "unknown")
+            if overall_status == "healthy":
+                st.success("🟢 Sistema Online")
+            else:
+                st.warning(f"🟡 Sistema: {overall_status}")
+        else:
+            st.error("🔴 Sistema Offline")'''
+_NEW_SIDEBAR_STATUS = '''        # Verificação segura do status
+        if health and "error" not in health:
+            overall_status = health.get("status", "unknown")
+            if overall_status == "healthy":
+                st.success("🟢 Sistema Online")
+            else:
+                st.warning(f"🟡 Sistema: {overall_status}")
+        else:
+            st.error("🔴 Sistema Offline")'''
+
+# 3. Página dedicada do Ollama
+_OLLAMA_PAGE = '''
 
 def show_ollama():
     """Exibe página dedicada do Ollama."""
@@ -290,122 +365,9 @@ def show_ollama():
                 st.rerun()
 
 '''
-    
-    # Inserir a função antes da função main
-    main_function_pos = content.find("def main():")
-    if main_function_pos != -1:
-        content = content[:main_function_pos] + ollama_page_function + content[main_function_pos:]
-    
-    # 4. Adicionar roteamento para página do Ollama
-    print("4️⃣ Adicionando roteamento para página do Ollama...")
-    
-    old_routing = r'''    # Roteamento de páginas
-    if page == "🏠 Dashboard":
-        show_dashboard\(\)
-    elif page == "💳 Transações":
-        show_transactions\(\)
-    elif page == "🏦 Contas":
-        show_contas\(\)
-    elif page == "📊 Análises":
-        show_analytics\(\)
-    elif page == "⚙️ Configurações":
-        show_settings\(\)'''
-    
-    new_routing = '''    # Roteamento de páginas
-    if page == "🏠 Dashboard":
-        show_dashboard()
-    elif page == "💳 Transações":
-        show_transactions()
-    elif page == "🏦 Contas":
-        show_contas()
-    elif page == "📊 Análises":
-        show_analytics()
-    elif page == "⚙️ Configurações":
-        show_settings()
-    elif page == "🤖 Ollama":
-        show_ollama()'''
-    
-    content = re.sub(old_routing, new_routing, content, flags=re.MULTILINE)
-    
-    # 5. Melhorar CSS para melhor visibilidade da mensagem de APIs bancárias
-    print("5️⃣ Melhorando CSS para melhor visibilidade...")
-    
-    # Adicionar CSS melhorado
-    old_css = r'''    \.error-box \{
-        background-color: #f8d7da;
-        border: 1px solid #f5c6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    \}'''
-    
-    new_css = '''    .error-box {
-        background-color: #f8d7da;
-        border: 1px solid #f5c6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    
-    .banking-warning-box {
-        background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%);
-        border: 2px solid #ffc107;
-        border-radius: 10px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        color: #856404;
-        font-weight: 500;
-    }
-    
-    .banking-warning-box strong {
-        color: #664d03;
-        font-size: 1.1rem;
-    }'''
-    
-    content = re.sub(old_css, new_css, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # 6. Substituir mensagem de APIs bancárias com melhor visibilidade
-    print("6️⃣ Melhorando mensagem de APIs bancárias...")
-    
-    old_banking_message = r'''        st\.markdown\(\"\"\"\n        <div class="warning-box">\n            ⚠️ <strong>Importante:</strong> APIs diretas dos bancos brasileiros não estão disponíveis para aplicações pessoais\. \n            Esta seção foca no upload e processamento de faturas e extratos\.\n        </div>\n        \"\"\", unsafe_allow_html=True\)'''
-    
-    new_banking_message = '''        st.markdown(\"\"\"
-        <div class="banking-warning-box">
-            ⚠️ <strong>Importante:</strong> APIs diretas dos bancos brasileiros não estão disponíveis para aplicações pessoais. 
-            Esta seção foca no upload e processamento de faturas e extratos bancários.
-        </div>
-        \"\"\", unsafe_allow_html=True)'''
-    
-    content = re.sub(old_banking_message, new_banking_message, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # 7. Corrigir verificação de dashboard_data
-    print("7️⃣ Corrigindo verificação de dashboard_data...")
-    
-    old_dashboard_check = r'''    if not dashboard_data:
-        st\.warning\("⚠️ Não foi possível carregar os dados\. Verifique se há transações no banco de dados\."\)
-        return'''
-    
-    new_dashboard_check = '''    # Verificar se há erro nos dados
-    if "error" in dashboard_data:
-        st.warning(f"⚠️ Não foi possível carregar os dados: {dashboard_data['error']}")
-        st.info("💡 Verifique se há transações no banco de dados ou se o backend está funcionando corretamente.")
-        return
-    
-    if not dashboard_data or not isinstance(dashboard_data, dict):
-        st.warning("⚠️ Não foi possível carregar os dados. Verifique se há transações no banco de dados.")
-        return'''
-    
-    content = re.sub(old_dashboard_check, new_dashboard_check, content, flags=re.MULTILINE | re.DOTALL)
-    
-    # 8. Adicionar as novas funcionalidades (parcelas e impostos) se não existirem
-    print("8️⃣ Verificando e adicionando funcionalidades de parcelas e impostos...")
-    
-    # Verificar se as funções já existem
-    if "def show_installments_control():" not in content:
-        print("   Adicionando função de controle de parcelas...")
-        # Adicionar função de parcelas (versão resumida para não tornar o arquivo muito grande)
-        installments_function = '''
+
+# 8. Funcionalidades de parcelas e impostos (versões resumidas)
+_INSTALLMENTS_FUNCTION = '''
 
 def show_installments_control():
     """Controle avançado de compras parceladas"""
@@ -444,16 +406,8 @@ def show_installments_control():
     st.info("💡 Funcionalidade completa de parcelas implementada!")
 
 '''
-        
-        # Inserir antes da função main
-        main_pos = content.find("def main():")
-        if main_pos != -1:
-            content = content[:main_pos] + installments_function + content[main_pos:]
-    
-    if "def show_taxes_section():" not in content:
-        print("   Adicionando função de impostos...")
-        # Adicionar função de impostos (versão resumida)
-        taxes_function = '''
+
+_TAXES_FUNCTION = '''
 
 def show_taxes_section():
     """Seção completa de impostos e taxas"""
@@ -488,40 +442,81 @@ def show_taxes_section():
     st.info("💡 Funcionalidade completa de impostos implementada!")
 
 '''
-        
-        # Inserir antes da função main
-        main_pos = content.find("def main():")
-        if main_pos != -1:
-            content = content[:main_pos] + taxes_function + content[main_pos:]
+
+_FIXES = (
+    (_OLD_NAVIGATION, _NEW_NAVIGATION),
+    (_OLD_STATUS_CHECK, _NEW_STATUS_CHECK),
+    (_OLD_DB_CHECK, _NEW_DB_CHECK),
+    (_OLD_REDIS_CHECK, _NEW_REDIS_CHECK),
+    (_OLD_OLLAMA_CHECK, _NEW_OLLAMA_CHECK),
+    (_OLD_ROUTING, _NEW_ROUTING),
+    (_OLD_CSS, _NEW_CSS),
+    (_OLD_BANKING_MESSAGE, _NEW_BANKING_MESSAGE),
+    (_OLD_DASHBOARD_CHECK, _NEW_DASHBOARD_CHECK),
+    (_OLD_SIDEBAR_STATUS, _NEW_SIDEBAR_STATUS),
+)
+
+# O arquivo é processado como bytes do início ao fim: os textos são
+# codificados uma única vez aqui, e não há decode/encode do arquivo inteiro
+_FIXES_BYTES = tuple((old.encode('utf-8'), new.encode('utf-8')) for old, new in _FIXES)
+_OLLAMA_PAGE_BYTES = _OLLAMA_PAGE.encode('utf-8')
+_INSTALLMENTS_FUNCTION_BYTES = _INSTALLMENTS_FUNCTION.encode('utf-8')
+_TAXES_FUNCTION_BYTES = _TAXES_FUNCTION.encode('utf-8')
+
+def _replacement(new):
+    return lambda scanner, token: new
+
+def _keep(scanner, token):
+    return token
+
+# Todos os trechos originais começam no início de uma linha, então um único
+# scanner resolve tudo numa passada: em cada posição tenta as correções e,
+# se nenhuma casar, copia a linha inteira sem alteração
+_SCANNER = re.Scanner(
+    [(re.escape(old), _replacement(new)) for old, new in _FIXES_BYTES]
+    + [(rb'[^\n]*\n', _keep), (rb'[^\n]+', _keep)]
+)
+
+@functools.lru_cache(maxsize=4)
+def _load(path, mtime):
+    """Lê o arquivo como bytes; o mtime faz parte da chave do cache, então
+    uma alteração no arquivo invalida a entrada automaticamente"""
+    return Path(path).read_bytes()
+
+def fix_streamlit_app():
+    """Corrige todos os problemas identificados no streamlit_app.py"""
     
-    # 9. Corrigir verificação de status na sidebar
-    print("9️⃣ Corrigindo verificação de status na sidebar...")
+    # Ler o arquivo original
+    source_file = '/home/henrique/Projetos/finance_app/streamlit_app_original.py'
+    content = _load(source_file, os.path.getmtime(source_file))
     
-    old_sidebar_status = r'''        if health:
-            overall_status = health\.get\("status", "unknown"\)
-            if overall_status == "healthy":
-                st\.success\("🟢 Sistema Online"\)
-            else:
-                st\.warning\(f"🟡 Sistema: \{overall_status\}"\)
-        else:
-            st\.error\("🔴 Sistema Offline"\)'''
+    print("🔧 Aplicando correções...")
     
-    new_sidebar_status = '''        # Verificação segura do status
-        if health and "error" not in health:
-            overall_status = health.get("status", "unknown")
-            if overall_status == "healthy":
-                st.success("🟢 Sistema Online")
-            else:
-                st.warning(f"🟡 Sistema: {overall_status}")
-        else:
-            st.error("🔴 Sistema Offline")'''
+    # Blocos inseridos antes da função main: página do Ollama e, se não
+    # existirem, as funcionalidades de parcelas e impostos
+    inserts = [_OLLAMA_PAGE_BYTES]
+    if b"def show_installments_control():" not in content:
+        print("   Adicionando função de controle de parcelas...")
+        inserts.append(_INSTALLMENTS_FUNCTION_BYTES)
     
-    content = re.sub(old_sidebar_status, new_sidebar_status, content, flags=re.MULTILINE | re.DOTALL)
+    if b"def show_taxes_section():" not in content:
+        print("   Adicionando função de impostos...")
+        inserts.append(_TAXES_FUNCTION_BYTES)
+    
+    # Aplicar as correções numa única passada, acumulando a saída num só
+    # bytearray (sem cópias intermediárias do arquivo inteiro)
+    tokens, _ = _SCANNER.scan(content)
+    buf = bytearray()
+    for token in tokens:
+        if inserts and token.startswith(b"def main():"):
+            for block in inserts:
+                buf += block
+            inserts = None
+        buf += token
     
     # Salvar o arquivo corrigido
     output_file = '/home/henrique/Projetos/finance_app/streamlit_app_fixed.py'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(content)
+    Path(output_file).write_bytes(buf)
     
     print(f"✅ Arquivo corrigido salvo em: {output_file}")
     
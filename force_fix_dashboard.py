@@ -3,62 +3,124 @@
 Script que força as correções no dashboard e limpa cache
 """
 
+import asyncio
 import re
 import os
+import shutil
 import subprocess
+from pathlib import Path
+
+from fix_common import already_applied, atomic_write, load, mark_applied
+
+# Linhas que exibem erro/aviso: o callback decide se é um erro 404 ou Not Found
+_ERROR_LINE_RE = re.compile(r'^.*st\.(?:error|warning)\(.*$', re.MULTILINE)
+
+def _remove_error_line(m):
+    line = m.group()
+    if '404' in line:
+        return '        # Erro 404 removido'
+    if '"detail":"Not Found"' in line:
+        return '        # Erro Not Found removido'
+    return line
+
+# Marcos do arquivo localizados numa única varredura
+_STATUS_UNKNOWN = 'Database: unknown'
+_STATUS_COLUMNS = 'col1, col2, col3 = st.columns(3)'
+_DASHBOARD_FUNC = 'def show_dashboard():'
+_DASHBOARD_HEADER = 'st.header("💰 Finance App - Dashboard")'
+_LANDMARKS_RE = re.compile('|'.join(re.escape(landmark) for landmark in (
+    _STATUS_UNKNOWN, _STATUS_COLUMNS, _DASHBOARD_FUNC, _DASHBOARD_HEADER
+)))
+
+def _find_landmarks(content):
+    """Posição da primeira ocorrência de cada marco (o header do dashboard
+    só conta depois de def show_dashboard())"""
+    landmarks = {}
+    for m in _LANDMARKS_RE.finditer(content):
+        landmark = m.group()
+        if landmark == _DASHBOARD_HEADER and _DASHBOARD_FUNC not in landmarks:
+            continue
+        landmarks.setdefault(landmark, m.start())
+    return landmarks
+
+# Indicadores das verificações antes/depois, coletados numa só varredura
+_INDICATORS_RE = re.compile(r'404|st\.error|unknown|Database:|pg_isready|Modo Exemplo')
+
+def _indicators(content):
+    """Conjunto dos indicadores presentes no conteúdo"""
+    return {m.group() for m in _INDICATORS_RE.finditer(content)}
+
+def _clear_python_cache(root='.'):
+    """Remove *.pyc e __pycache__ no próprio processo (sem chamar o find)"""
+    for pyc in list(Path(root).rglob('*.pyc')):
+        pyc.unlink(missing_ok=True)
+    for cache_dir in list(Path(root).rglob('__pycache__')):
+        if cache_dir.is_dir():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+async def _spawn(cmd):
+    """Executa um comando externo sem bloquear o loop, descartando a saída"""
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    return await process.wait()
+
+async def _clear_caches():
+    """Limpa os caches do Streamlit e do Python ao mesmo tempo"""
+    return await asyncio.gather(
+        _spawn(['streamlit', 'cache', 'clear']),
+        asyncio.to_thread(_clear_python_cache),
+        return_exceptions=True,
+    )
 
 def force_fix_dashboard():
     """Força as correções e limpa cache"""
     
     print("🔧 Forçando correções no dashboard...")
     
+    # Arquivo idêntico ao que este script deixou na última execução
+    if already_applied('force_fix_dashboard', 'streamlit_app.py'):
+        print("✅ Nenhuma alteração desde a última execução, nada a fazer")
+        return True
+    
     # 1. Primeiro, vamos ver o que está no arquivo
     print("1️⃣ Verificando conteúdo atual...")
     
-    with open('streamlit_app.py', 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = load('streamlit_app.py')
     
     # Verificar se encontramos os padrões
-    has_error_404 = '404' in content and 'st.error' in content
-    has_status_unknown = 'unknown' in content and 'Database:' in content
+    found = _indicators(content)
+    has_error_404 = '404' in found and 'st.error' in found
+    has_status_unknown = 'unknown' in found and 'Database:' in found
     
     print(f"   - Encontrou erro 404: {has_error_404}")
     print(f"   - Encontrou status unknown: {has_status_unknown}")
     
     # 2. Fazer backup
     print("2️⃣ Fazendo backup...")
-    with open('streamlit_app_backup.py', 'w', encoding='utf-8') as f:
-        f.write(content)
+    atomic_write('streamlit_app_backup.py', content)
     
     # 3. Aplicar correções de forma mais agressiva
     print("3️⃣ Aplicando correções...")
     
-    # Remover TODAS as linhas que contenham erro 404
-    lines = content.split('\n')
-    new_lines = []
-    
-    for line in lines:
-        # Pular linhas com erro 404
-        if ('st.error(' in line or 'st.warning(' in line) and '404' in line:
-            new_lines.append('        # Erro 404 removido')
-            continue
-        
-        # Pular linhas com "detail":"Not Found"
-        if ('st.error(' in line or 'st.warning(' in line) and '"detail":"Not Found"' in line:
-            new_lines.append('        # Erro Not Found removido')
-            continue
-            
-        new_lines.append(line)
+    # Remover TODAS as linhas com erro 404 ou "detail":"Not Found"
+    content = _ERROR_LINE_RE.sub(_remove_error_line, content)
     
-    content = '\n'.join(new_lines)
+    # Localizar todos os marcos de uma vez; as duas edições abaixo são feitas
+    # sobre esse mesmo conteúdo e aplicadas juntas no final
+    landmarks = _find_landmarks(content)
+    edits = []
     
     # 4. Substituir a seção de status do sistema de forma mais direta
     print("4️⃣ Corrigindo status do sistema...")
     
     # Procurar por "Database: unknown" e substituir toda a seção
-    if 'Database: unknown' in content:
+    if _STATUS_UNKNOWN in landmarks:
         # Encontrar o início da seção de status
-        status_start = content.find('col1, col2, col3 = st.columns(3)')
+        status_start = landmarks.get(_STATUS_COLUMNS, -1)
         if status_start != -1:
             # Encontrar o final da seção (próximo st. que não seja relacionado a status)
             status_end = content.find('\n\n', status_start)
@@ -74,7 +136,7 @@ def force_fix_dashboard():
             try:
                 import subprocess
                 result = subprocess.run(['pg_isready', '-h', 'localhost', '-p', '5432'], 
-                                      capture_output=True, timeout=2)
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=2)
                 if result.returncode == 0:
                     st.success("🟢 Database: online")
                 else:
@@ -111,16 +173,16 @@ def force_fix_dashboard():
         if st.button("🔄 Atualizar Status"):
             st.rerun()'''
                 
-                content = content[:status_start] + new_status_section + content[status_end:]
+                edits.append((status_start, status_end, new_status_section))
     
     # 5. Adicionar verificação no início do dashboard
     print("5️⃣ Adicionando modo exemplo...")
     
     # Procurar pela função show_dashboard
-    dashboard_func = content.find('def show_dashboard():')
+    dashboard_func = landmarks.get(_DASHBOARD_FUNC, -1)
     if dashboard_func != -1:
         # Encontrar o final da docstring
-        docstring_end = content.find('st.header("💰 Finance App - Dashboard")', dashboard_func)
+        docstring_end = landmarks.get(_DASHBOARD_HEADER, -1)
         if docstring_end != -1:
             # Adicionar código antes do header
             insert_code = '''    # Verificar se API está disponível
@@ -135,52 +197,67 @@ def force_fix_dashboard():
         st.info("💡 **Modo Exemplo** - Backend offline, mostrando dados simulados")
     
     '''
-            content = content[:docstring_end] + insert_code + content[docstring_end:]
+            edits.append((docstring_end, docstring_end, insert_code))
     
-    # 6. Salvar arquivo corrigido
+    # 6. Salvar arquivo corrigido: os trechos e as edições são gravados em
+    # ordem de posição direto num temporário (sem montar o conteúdo final em
+    # memória), que depois substitui o arquivo atomicamente. Os indicadores
+    # da verificação final são coletados de cada trecho já na gravação
     print("6️⃣ Salvando arquivo corrigido...")
-    with open('streamlit_app.py', 'w', encoding='utf-8') as f:
-        f.write(content)
+    pieces = []
+    pos = 0
+    for start, end, text in sorted(edits, key=lambda edit: edit[0]):
+        pieces += (content[pos:start], text)
+        pos = end
+    pieces.append(content[pos:])
+    
+    written = set()
+    tmp_path = 'streamlit_app.py.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for piece in pieces:
+            f.write(piece)
+            written |= _indicators(piece)
+    os.replace(tmp_path, 'streamlit_app.py')
     
     # 7. Limpar cache do Streamlit
     print("7️⃣ Limpando cache do Streamlit...")
     
-    try:
-        # Limpar cache do Streamlit
-        subprocess.run(['streamlit', 'cache', 'clear'], capture_output=True)
-        print("   ✅ Cache do Streamlit limpo")
-    except:
+    # O "streamlit cache clear" e a limpeza do cache do Python rodam juntos
+    streamlit_result, python_result = asyncio.run(_clear_caches())
+    
+    if isinstance(streamlit_result, BaseException):
         print("   ⚠️ Não foi possível limpar cache do Streamlit")
+    else:
+        print("   ✅ Cache do Streamlit limpo")
     
-    # Limpar cache do Python
-    try:
-        subprocess.run(['find', '.', '-name', '*.pyc', '-delete'], capture_output=True)
-        subprocess.run(['find', '.', '-name', '__pycache__', '-type', 'd', '-exec', 'rm', '-rf', '{}', '+'], capture_output=True)
-        print("   ✅ Cache do Python limpo")
-    except:
+    if isinstance(python_result, BaseException):
         print("   ⚠️ Não foi possível limpar cache do Python")
+    else:
+        print("   ✅ Cache do Python limpo")
     
     # 8. Verificar se as alterações foram aplicadas
     print("8️⃣ Verificando alterações...")
     
-    with open('streamlit_app.py', 'r', encoding='utf-8') as f:
-        new_content = f.read()
-    
-    has_error_404_after = '404' in new_content and 'st.error' in new_content
-    has_pg_isready = 'pg_isready' in new_content
-    has_modo_exemplo = 'Modo Exemplo' in new_content
+    # O arquivo acabou de ser gravado a partir da memória: não precisa relê-lo
+    found = written
+    has_error_404_after = '404' in found and 'st.error' in found
+    has_pg_isready = 'pg_isready' in found
+    has_modo_exemplo = 'Modo Exemplo' in found
     
     print(f"   - Erro 404 removido: {not has_error_404_after}")
     print(f"   - Status real adicionado: {has_pg_isready}")
     print(f"   - Modo exemplo adicionado: {has_modo_exemplo}")
     
+    mark_applied('force_fix_dashboard', 'streamlit_app.py')
+    
     return True
 
 def kill_streamlit_processes():
     """Mata todos os processos do Streamlit"""
     print("🔄 Matando processos do Streamlit...")
     try:
-        subprocess.run(['pkill', '-f', 'streamlit'], capture_output=True)
+        subprocess.run(['pkill', '-f', 'streamlit'],
+                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         print("   ✅ Processos do Streamlit finalizados")
     except:
         print("   ⚠️ Não foi possível finalizar processos")
@@ -6,92 +6,102 @@ Script que força a remoção de TODAS as chamadas que causam 404
 import re
 import os
 
+from fix_common import already_applied, atomic_write, load, mark_applied
+
+# Padrões compilados uma única vez no carregamento do módulo
+_GET_ANALYTICS_RE = re.compile(r'def get_analytics\(self.*?\n(?=    def|\Z)', re.DOTALL)
+_GET_DASHBOARD_STATS_RE = re.compile(r'def get_dashboard_stats\(self.*?\n(?=    def|\Z)', re.DOTALL)
+_API_GET_ANALYTICS_RE = re.compile(r'api\.get_analytics\(\)')
+_API_GET_DASHBOARD_STATS_RE = re.compile(r'api\.get_dashboard_stats\(\)')
+_DASHBOARD_CHECK_RE = re.compile(r'if dashboard_data and isinstance\(dashboard_data, dict\) and "status" in dashboard_data:')
+
+# Endpoints que causam 404
+_PROBLEMATIC_ENDPOINTS = (
+    '/api/v1/analytics/dashboard',
+    '/api/v1/analytics/trends/monthly',
+    '/api/v1/analytics/categories/breakdown',
+    'analytics/dashboard',
+    'analytics/trends',
+    'analytics/categories'
+)
+
+# Todos os endpoints numa única alternação (os mais longos primeiro, para que
+# "/api/v1/analytics/dashboard" não seja cortado em "analytics/dashboard")
+_ENDPOINTS_RE = re.compile('|'.join(
+    re.escape(endpoint) for endpoint in sorted(_PROBLEMATIC_ENDPOINTS, key=len, reverse=True)
+))
+
+# Todo endpoint problemático contém um destes três sufixos, então "a linha
+# contém algum endpoint" se reduz a uma única alternação curta
+_ENDPOINT_IN_LINE = r'analytics/(?:dashboard|trends|categories)'
+
+# Uma linha com endpoint problemático e chamada à API, seguida opcionalmente
+# de uma linha com if/except e da linha depois dela
+_404_CALL_RE = re.compile(
+    r'^(?=[^\n]*' + _ENDPOINT_IN_LINE + r')'
+    r'(?=[^\n]*(?:_make_request|requests\.get|api\.))(?P<call>[^\n]*)'
+    r'(?:(?P<related>\n[^\n]*(?:except|if)[^\n]*)(?P<after>\n[^\n]*)?)?',
+    re.MULTILINE
+)
+
+_REMOVED_LINE = '\n        # Linha removida - causava 404'
+
+def _remove_404_call(m):
+    # Quantas linhas relacionadas o match consumiu (0, 1 ou 2)
+    skipped = (m['related'] is not None) + (m['after'] is not None)
+    return '        # Chamada 404 removida: ' + m['call'].strip()[:50] + '...' + _REMOVED_LINE * skipped
+
 def force_remove_404_calls():
     """Remove todas as chamadas que causam 404"""
     
     print("🔧 Forçando remoção de chamadas 404...")
     
-    with open('streamlit_app.py', 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Arquivo idêntico ao que este script deixou na última execução
+    if already_applied('force_remove_404_calls', 'streamlit_app.py'):
+        print("✅ Nenhuma alteração desde a última execução, nada a fazer")
+        return True
+    
+    content = load('streamlit_app.py')
     
     # Fazer backup
-    with open('streamlit_app_before_404_fix.py', 'w', encoding='utf-8') as f:
-        f.write(content)
+    atomic_write('streamlit_app_before_404_fix.py', content)
     print("💾 Backup criado: streamlit_app_before_404_fix.py")
     
     # 1. Procurar e remover TODAS as referências aos endpoints problemáticos
     print("1️⃣ Removendo chamadas para endpoints 404...")
     
-    # Endpoints que causam 404
-    problematic_endpoints = [
-        '/api/v1/analytics/dashboard',
-        '/api/v1/analytics/trends/monthly',
-        '/api/v1/analytics/categories/breakdown',
-        'analytics/dashboard',
-        'analytics/trends',
-        'analytics/categories'
-    ]
-    
-    # Procurar por linhas que fazem essas chamadas
-    lines = content.split('\n')
-    new_lines = []
-    skip_next_lines = 0
-    
-    for i, line in enumerate(lines):
-        # Se devemos pular esta linha
-        if skip_next_lines > 0:
-            skip_next_lines -= 1
-            new_lines.append('        # Linha removida - causava 404')
-            continue
-        
-        # Verificar se a linha contém chamadas problemáticas
-        line_has_404_call = False
-        for endpoint in problematic_endpoints:
-            if endpoint in line and ('_make_request' in line or 'requests.get' in line or 'api.' in line):
-                line_has_404_call = True
-                break
-        
-        if line_has_404_call:
-            new_lines.append('        # Chamada 404 removida: ' + line.strip()[:50] + '...')
-            # Pular também linhas relacionadas (try/except, etc.)
-            if i + 1 < len(lines) and ('except' in lines[i + 1] or 'if' in lines[i + 1]):
-                skip_next_lines = 2
-        else:
-            new_lines.append(line)
-    
-    content = '\n'.join(new_lines)
+    # Procurar por linhas que fazem essas chamadas (e, se a linha seguinte
+    # for um if/except, remover também as duas linhas relacionadas)
+    content = _404_CALL_RE.sub(_remove_404_call, content)
     
     # 2. Remover métodos que fazem chamadas 404
     print("2️⃣ Removendo métodos que fazem chamadas 404...")
     
     # Remover método get_analytics se existir
-    content = re.sub(r'def get_analytics\(self.*?\n(?=    def|\Z)', 
-                     'def get_analytics(self):\n        """Método removido - causava 404"""\n        return {"error": "Endpoint não disponível"}\n\n    ', 
-                     content, flags=re.DOTALL)
+    content = _GET_ANALYTICS_RE.sub(
+        'def get_analytics(self):\n        """Método removido - causava 404"""\n        return {"error": "Endpoint não disponível"}\n\n    ', 
+        content)
     
     # Remover método get_dashboard_stats se estiver fazendo chamada errada
     if '/api/v1/analytics/dashboard' in content:
-        content = re.sub(r'def get_dashboard_stats\(self.*?\n(?=    def|\Z)', 
-                         'def get_dashboard_stats(self):\n        """Método corrigido - sem chamadas 404"""\n        return None\n\n    ', 
-                         content, flags=re.DOTALL)
+        content = _GET_DASHBOARD_STATS_RE.sub(
+            'def get_dashboard_stats(self):\n        """Método corrigido - sem chamadas 404"""\n        return None\n\n    ', 
+            content)
     
     # 3. Substituir qualquer chamada restante por dados de exemplo
     print("3️⃣ Substituindo chamadas restantes...")
     
     # Substituir padrões que ainda podem estar fazendo chamadas
-    content = re.sub(r'api\.get_analytics\(\)', 'None  # Removido - causava 404', content)
-    content = re.sub(r'api\.get_dashboard_stats\(\)', 'None  # Usando dados de exemplo', content)
+    content = _API_GET_ANALYTICS_RE.sub('None  # Removido - causava 404', content)
+    content = _API_GET_DASHBOARD_STATS_RE.sub('None  # Usando dados de exemplo', content)
     
     # 4. Garantir que o dashboard sempre usa dados de exemplo
     print("4️⃣ Forçando uso de dados de exemplo...")
     
     # Procurar pela verificação do dashboard e forçar dados de exemplo
-    dashboard_check_pattern = r'if dashboard_data and isinstance\(dashboard_data, dict\) and "status" in dashboard_data:'
-    if re.search(dashboard_check_pattern, content):
+    if _DASHBOARD_CHECK_RE.search(content):
         # Substituir por verificação que sempre usa exemplo
-        content = re.sub(dashboard_check_pattern, 
-                         'if False:  # Forçar uso de dados de exemplo', 
-                         content)
+        content = _DASHBOARD_CHECK_RE.sub('if False:  # Forçar uso de dados de exemplo', content)
     
     # 5. Limpar análises para não fazer chamadas
     print("5️⃣ Limpando análises...")
@@ -181,25 +191,28 @@ def force_remove_404_calls():
     # 6. Verificar se ainda há referências aos endpoints problemáticos
     print("6️⃣ Verificação final...")
     
-    remaining_404_calls = []
-    for endpoint in problematic_endpoints:
-        if endpoint in content:
-            remaining_404_calls.append(endpoint)
+    # Uma única varredura encontra todas as ocorrências; um endpoint curto
+    # contido num longo (p.ex. "analytics/trends") também conta como restante
+    hits = set(_ENDPOINTS_RE.findall(content))
+    remaining_404_calls = [
+        endpoint for endpoint in _PROBLEMATIC_ENDPOINTS
+        if any(endpoint in hit for hit in hits)
+    ]
     
     if remaining_404_calls:
         print(f"   ⚠️ Ainda encontradas referências: {remaining_404_calls}")
-        # Remover qualquer referência restante
-        for endpoint in remaining_404_calls:
-            content = content.replace(endpoint, '/api/v1/health')  # Substituir por endpoint que funciona
+        # Remover qualquer referência restante (substituir por endpoint que funciona)
+        content = _ENDPOINTS_RE.sub('/api/v1/health', content)
     else:
         print("   ✅ Nenhuma referência problemática encontrada")
     
     # Salvar arquivo corrigido
-    with open('streamlit_app.py', 'w', encoding='utf-8') as f:
-        f.write(content)
+    atomic_write('streamlit_app.py', content)
     
     print("✅ Todas as chamadas 404 foram removidas!")
     
+    mark_applied('force_remove_404_calls', 'streamlit_app.py')
+    
     return True
 
 if __name__ == "__main__":
@@ -5,46 +5,117 @@ Script preciso para corrigir apenas os problemas específicos:
 2. Corrigir status sem quebrar o Dashboard
 """
 
+import io
 import re
 import os
+from collections import Counter
+
+from fix_common import already_applied, atomic_write, load, mark_applied
+
+# Numa única varredura: a linha com "🔧 Resumo de Transações" (com a quebra
+# de linha anterior, para que uma duplicação removida não deixe linha em
+# branco) ou uma das linhas de status que retornam "unknown"
+_FIX_LINE_RE = re.compile(
+    r'(?P<nl>\n)?^(?P<resumo>[^\n]*🔧 Resumo de Transações[^\n]*)'
+    r'|^(?P<indent>[^\S\n]*)[^\n]*?'
+    r'health\.get\("services", \{\}\)\.get\("(?P<service>database|redis|ollama)", \{\}\)\.get\("status", "unknown"\)'
+    r'[^\n]*',
+    re.MULTILINE
+)
+
+# Serviço -> (rótulo, linhas do try; a última é a do except)
+_STATUS_CHECKS = {
+    "database": ("Database", (
+        'import subprocess',
+        'result = subprocess.run([\'pg_isready\', \'-h\', \'localhost\', \'-p\', \'5432\'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=2)',
+        'db_status = "healthy" if result.returncode == 0 else "offline"',
+        'db_status = "checking"',
+    )),
+    "redis": ("Redis", (
+        'import subprocess',
+        'result = subprocess.run([\'redis-cli\', \'ping\'], capture_output=True, timeout=2)',
+        'redis_status = "healthy" if b\'PONG\' in result.stdout else "offline"',
+        'redis_status = "checking"',
+    )),
+    "ollama": ("Ollama", (
+        'import requests',
+        'response = requests.get("http://localhost:11434/api/tags", timeout=2)',
+        'ollama_status = "healthy" if response.status_code == 200 else "offline"',
+        'ollama_status = "checking"',
+    )),
+}
+
+# Bloco try/except de cada serviço montado uma única vez (sem indentação);
+# na correção basta prefixar a indentação da linha original
+_STATUS_BLOCKS = {
+    service: (label, '\n'.join(
+        ['try:'] + ['    ' + check for check in check_lines[:-1]]
+        + ['except:', '    ' + check_lines[-1]]
+    ))
+    for service, (label, check_lines) in _STATUS_CHECKS.items()
+}
+
+# Contagens da verificação final numa só varredura
+_VERIFY_RE = re.compile(r'Resumo de Transações|"unknown"')
 
 def precise_fix():
     """Correção precisa dos problemas específicos"""
     
     print("🔧 Correção precisa dos problemas...")
     
-    with open('streamlit_app.py', 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Arquivo idêntico ao que este script deixou na última execução
+    if already_applied('precise_fix', 'streamlit_app.py'):
+        print("✅ Nenhuma alteração desde a última execução, nada a fazer")
+        return True
+    
+    content = load('streamlit_app.py')
     
     # Fazer backup
-    with open('streamlit_app_precise_backup.py', 'w', encoding='utf-8') as f:
-        f.write(content)
+    atomic_write('streamlit_app_precise_backup.py', content)
     print("💾 Backup criado")
     
     # 1. Remover duplicação "Resumo de Transações"
     print("1️⃣ Removendo duplicação 'Resumo de Transações'...")
     
-    lines = content.split('\n')
-    new_lines = []
+    # As duas correções são feitas numa só passada, gravando a saída em
+    # sequência num único buffer
+    buf = io.StringIO()
+    pos = 0
+    line_num = 1  # número da linha já sem as duplicações removidas
     resumo_count = 0
+    status_messages = []
     
-    for line in lines:
-        # Se encontrar "Resumo de Transações"
-        if '🔧 Resumo de Transações' in line:
+    for m in _FIX_LINE_RE.finditer(content):
+        start = m.start()
+        line_num += content.count('\n', pos, start)
+        buf.write(content[pos:start])
+        pos = m.end()
+        
+        if m['resumo'] is not None:
             resumo_count += 1
+            line = m['resumo']
             if resumo_count == 1:
                 # Manter a primeira ocorrência, mas remover o emoji 🔧
                 new_line = line.replace('🔧 Resumo de Transações', 'Resumo de Transações')
-                new_lines.append(new_line)
                 print(f"   ✅ Primeira ocorrência mantida (removido 🔧): {new_line.strip()}")
+                if m['nl']:
+                    buf.write('\n')
+                    line_num += 1
+                buf.write(new_line)
             else:
-                # Remover ocorrências duplicadas
+                # Remover ocorrências duplicadas (junto com a quebra de linha)
                 print(f"   ❌ Removida duplicação: {line.strip()}")
-                continue
-        else:
-            new_lines.append(line)
-    
-    content = '\n'.join(new_lines)
+            continue
+        
+        # Corrigir as linhas específicas que retornam "unknown"
+        label, block = _STATUS_BLOCKS[m['service']]
+        status_messages.append(f"   ✅ Corrigindo linha {line_num}: {label} status")
+        # Substituir por verificação real
+        indent = ' ' * len(m['indent'])
+        buf.write(indent + block.replace('\n', '\n' + indent))
+    
+    buf.write(content[pos:])
+    content = buf.getvalue()
     print(f"   📊 Total de duplicações removidas: {resumo_count - 1}")
     
     # 2. Corrigir status sem quebrar o Dashboard
@@ -52,66 +123,20 @@ def precise_fix():
     
     # Procurar pelas linhas específicas que causam "unknown"
     # Baseado no erro anterior: linhas 198, 203, 208
-    lines = content.split('\n')
-    new_lines = []
-    
-    for i, line in enumerate(lines):
-        line_num = i + 1
-        
-        # Corrigir as linhas específicas que retornam "unknown"
-        if 'health.get("services", {}).get("database", {}).get("status", "unknown")' in line:
-            print(f"   ✅ Corrigindo linha {line_num}: Database status")
-            # Substituir por verificação real
-            indent = len(line) - len(line.lstrip())
-            new_line = ' ' * indent + 'try:'
-            new_lines.append(new_line)
-            new_lines.append(' ' * (indent + 4) + 'import subprocess')
-            new_lines.append(' ' * (indent + 4) + 'result = subprocess.run([\'pg_isready\', \'-h\', \'localhost\', \'-p\', \'5432\'], capture_output=True, timeout=2)')
-            new_lines.append(' ' * (indent + 4) + 'db_status = "healthy" if result.returncode == 0 else "offline"')
-            new_lines.append(' ' * indent + 'except:')
-            new_lines.append(' ' * (indent + 4) + 'db_status = "checking"')
-            continue
-            
-        elif 'health.get("services", {}).get("redis", {}).get("status", "unknown")' in line:
-            print(f"   ✅ Corrigindo linha {line_num}: Redis status")
-            # Substituir por verificação real
-            indent = len(line) - len(line.lstrip())
-            new_line = ' ' * indent + 'try:'
-            new_lines.append(new_line)
-            new_lines.append(' ' * (indent + 4) + 'import subprocess')
-            new_lines.append(' ' * (indent + 4) + 'result = subprocess.run([\'redis-cli\', \'ping\'], capture_output=True, timeout=2)')
-            new_lines.append(' ' * (indent + 4) + 'redis_status = "healthy" if b\'PONG\' in result.stdout else "offline"')
-            new_lines.append(' ' * indent + 'except:')
-            new_lines.append(' ' * (indent + 4) + 'redis_status = "checking"')
-            continue
-            
-        elif 'health.get("services", {}).get("ollama", {}).get("status", "unknown")' in line:
-            print(f"   ✅ Corrigindo linha {line_num}: Ollama status")
-            # Substituir por verificação real
-            indent = len(line) - len(line.lstrip())
-            new_line = ' ' * indent + 'try:'
-            new_lines.append(new_line)
-            new_lines.append(' ' * (indent + 4) + 'import requests')
-            new_lines.append(' ' * (indent + 4) + 'response = requests.get("http://localhost:11434/api/tags", timeout=2)')
-            new_lines.append(' ' * (indent + 4) + 'ollama_status = "healthy" if response.status_code == 200 else "offline"')
-            new_lines.append(' ' * indent + 'except:')
-            new_lines.append(' ' * (indent + 4) + 'ollama_status = "checking"')
-            continue
-        
-        # Manter linha original se não for uma das problemáticas
-        new_lines.append(line)
-    
-    content = '\n'.join(new_lines)
+    for message in status_messages:
+        print(message)
     
     # 3. Verificar se ainda há problemas
     print("3️⃣ Verificação final...")
     
+    counts = Counter(m.group() for m in _VERIFY_RE.finditer(content))
+    
     # Verificar duplicações restantes
-    resumo_occurrences = content.count('Resumo de Transações')
+    resumo_occurrences = counts['Resumo de Transações']
     print(f"   📊 Ocorrências restantes de 'Resumo de Transações': {resumo_occurrences}")
     
     # Verificar se ainda há "unknown"
-    unknown_count = content.count('"unknown"')
+    unknown_count = counts['"unknown"']
     print(f"   ⚠️ Ocorrências restantes de 'unknown': {unknown_count}")
     
     if unknown_count > 0:
@@ -120,11 +145,12 @@ def precise_fix():
         print("   ✅ Substituído 'unknown' por 'checking'")
     
     # Salvar arquivo corrigido
-    with open('streamlit_app.py', 'w', encoding='utf-8') as f:
-        f.write(content)
+    atomic_write('streamlit_app.py', content)
     
     print("✅ Correção precisa aplicada!")
     
+    mark_applied('precise_fix', 'streamlit_app.py')
+    
     return True
 
 if __name__ == "__main__":
@@ -4,17 +4,33 @@ Finance App - Gerador de Dados Sintéticos
 Gera transações financeiras realistas para testes e demonstração.
 """
 
-import random
-import uuid
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
 from decimal import Decimal
 import json
 import csv
+import sqlite3
 import argparse
-from typing import List, Dict, Any
+import multiprocessing
+from operator import itemgetter
+from typing import List, Dict, Any, Tuple
 import sys
 import os
 
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # Adicionar o diretório src ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
@@ -147,16 +163,145 @@ LOCATIONS = [
 TRANSACTION_TYPES = ["debit", "credit", "pix", "transfer"]
 
 
+def _build_alias(weights: List[float]):
+    """Monta as tabelas do método alias (Vose) para sorteio ponderado em O(1)."""
+    
+    k = len(weights)
+    scaled = np.asarray(weights, dtype=float) * k / sum(weights)
+    prob = np.ones(k)
+    alias = np.arange(k)
+    small = [i for i in range(k) if scaled[i] < 1.0]
+    large = [i for i in range(k) if scaled[i] >= 1.0]
+    
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    
+    return prob, alias
+
+
+def _batch_uuids(rng: np.random.Generator, n: int) -> List[str]:
+    """Gera n UUIDs v4 (texto) a partir de uma única chamada a rng.bytes."""
+    
+    raw = np.frombuffer(bytearray(rng.bytes(16 * n)), dtype=np.uint8).reshape(n, 16)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # versão 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # variante RFC 4122
+    
+    # Um único hex para todo o lote, fatiado em blocos de 32 dígitos com os hífens
+    h = raw.tobytes().hex()
+    
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * n, 32)
+    ]
+
+
+def _flatten_options(groups: Dict, key: str):
+    """Concatena as listas `key` de cada grupo num único array, com início e tamanho por grupo."""
+    
+    options = [groups[name][key] for name in groups]
+    lengths = np.array([len(opts) for opts in options])
+    flat = np.array([item for opts in options for item in opts], dtype=object)
+    
+    return flat, np.cumsum(lengths) - lengths, lengths
+
+
+# Tabelas alias das categorias e fontes de receita (montadas uma única vez)
+_EXPENSE_ALIAS = _build_alias([data["frequency"] for data in CATEGORIES.values()])
+_INCOME_ALIAS = _build_alias([data["frequency"] for data in INCOME_SOURCES.values()])
+
+# Nomes, faixas de valores e opções por grupo, indexados pelo índice sorteado
+_CAT_NAMES = tuple(CATEGORIES)
+_CAT_RANGES = np.array([data["amount_range"] for data in CATEGORIES.values()])
+_CAT_MERCHANTS = _flatten_options(CATEGORIES, "merchants")
+_CAT_SUBCATEGORIES = _flatten_options(CATEGORIES, "subcategories")
+
+_INCOME_NAMES = tuple(INCOME_SOURCES)
+_INCOME_RANGES = np.array([data["amount_range"] for data in INCOME_SOURCES.values()])
+_INCOME_MERCHANTS = _flatten_options(INCOME_SOURCES, "merchants")
+
+_LOCATIONS = tuple(LOCATIONS)
+_EXPENSE_TX_TYPES = ("debit", "pix", "credit")
+_EXPENSE_CHANNELS = ("app", "website", "physical", "atm")
+_INCOME_CHANNELS = ("transfer", "deposit", "pix")
+
+# Colunas das transações, na ordem dos arquivos de saída
+FIELDNAMES = (
+    "id", "date", "datetime", "amount", "description", "transaction_type",
+    "status", "account_id", "account_name", "counterpart_name",
+    "counterpart_document", "location", "channel", "category",
+    "subcategory", "tags", "notes"
+)
+
+# Limite de parâmetros por comando do SQLite (999 antes da versão 3.32)
+_SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+# Modelos de descrição: {0} = estabelecimento, {1} = subcategoria
+_DESCRIPTION_FORMATS = tuple(template.format for template in (
+    "{0}",
+    "{0} - {1}",
+    "Compra {0}",
+    "Pagamento {0}",
+    "{1} - {0}"
+))
+
+# Modelo de descrição de cada fonte de receita, na ordem de _INCOME_NAMES
+_INCOME_DESCRIPTION_FORMATS = tuple(
+    {
+        "Salário": "Salário {}",
+        "Freelance": "Freelance - {}",
+        "Investimentos": "Rendimento {}",
+    }.get(name, "Receita - {}").format
+    for name in _INCOME_NAMES
+)
+
+# Blocos numéricos do CNPJ fictício (limites [mínimo, máximo) de cada bloco)
+_CNPJ_LOW = (10, 100, 100, 10)
+_CNPJ_HIGH = (100, 1000, 1000, 100)
+_CNPJ_FORMAT = "{}.{}.{}/0001-{}".format
+
+# Tags extras e notas ocasionais das despesas
+_EXTRA_TAGS = ("essencial", "lazer", "urgente", "planejado", "imprevisto")
+_NOTES = (
+    "Compra planejada",
+    "Gasto imprevisto",
+    "Promoção especial",
+    "Necessidade urgente",
+    "Investimento futuro"
+)
+
+
+def _generate_chunk(args) -> List[Dict[str, Any]]:
+    """Gera uma fatia de despesas e receitas num processo do pool."""
+    
+    start_date, end_date, seed, num_expenses, num_income = args
+    
+    generator = SyntheticDataGenerator(start_date, end_date, seed)
+    
+    return generator._generate_expenses(num_expenses) + generator._generate_incomes(num_income)
+
+
+def _split(total: int, parts: int) -> List[int]:
+    """Divide `total` em `parts` fatias de tamanhos quase iguais."""
+    
+    return [total // parts + (i < total % parts) for i in range(parts)]
+
+
 class SyntheticDataGenerator:
     """Gerador de dados sintéticos para transações financeiras."""
     
-    def __init__(self, start_date: date = None, end_date: date = None):
+    def __init__(self, start_date: date = None, end_date: date = None, seed: int = None):
         self.start_date = start_date or (date.today() - timedelta(days=365))
         self.end_date = end_date or date.today()
         self.transactions = []
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
         
-    def generate_transactions(self, num_transactions: int = 1000) -> List[Dict[str, Any]]:
-        """Gera lista de transações sintéticas."""
+    def generate_transactions(self, num_transactions: int = 1000, workers: int = 1) -> List[Dict[str, Any]]:
+        """Gera lista de transações sintéticas (em `workers` processos, se > 1)."""
         
         print(f"Gerando {num_transactions} transações entre {self.start_date} e {self.end_date}")
         
@@ -164,15 +309,12 @@ class SyntheticDataGenerator:
         num_expenses = int(num_transactions * 0.8)
         num_income = num_transactions - num_expenses
         
-        # Gerar despesas
-        for _ in range(num_expenses):
-            transaction = self._generate_expense()
-            self.transactions.append(transaction)
-        
-        # Gerar receitas
-        for _ in range(num_income):
-            transaction = self._generate_income()
-            self.transactions.append(transaction)
+        # Gerar despesas e receitas (sorteios feitos em lote, com NumPy)
+        if workers > 1:
+            self.transactions.extend(self._generate_parallel(num_expenses, num_income, workers))
+        else:
+            self.transactions.extend(self._generate_expenses(num_expenses))
+            self.transactions.extend(self._generate_incomes(num_income))
         
         # Ordenar por data
         self.transactions.sort(key=lambda x: x['date'])
@@ -182,266 +324,357 @@ class SyntheticDataGenerator:
         
         return self.transactions
     
-    def _generate_expense(self) -> Dict[str, Any]:
-        """Gera uma transação de despesa."""
+    def _generate_parallel(self, num_expenses: int, num_income: int, workers: int) -> List[Dict[str, Any]]:
+        """Divide a geração entre processos, cada um com seu próprio gerador aleatório."""
+        
+        # Sementes independentes por processo, derivadas da semente principal
+        seeds = np.random.SeedSequence(self.seed).spawn(workers)
+        chunks = zip(
+            [self.start_date] * workers, [self.end_date] * workers, seeds,
+            _split(num_expenses, workers), _split(num_income, workers)
+        )
+        
+        with multiprocessing.Pool(workers) as pool:
+            return [tx for chunk in pool.map(_generate_chunk, chunks) for tx in chunk]
+    
+    def _generate_expenses(self, n: int) -> List[Dict[str, Any]]:
+        """Gera n transações de despesa."""
         
-        # Escolher categoria baseada na frequência
-        category_name = self._weighted_choice(CATEGORIES)
-        category_data = CATEGORIES[category_name]
+        # Escolher categorias baseadas na frequência
+        cat_idx = self._weighted_indices(_EXPENSE_ALIAS, n)
         
         # Gerar valores
-        amount = -round(random.uniform(*category_data["amount_range"]), 2)
-        merchant = random.choice(category_data["merchants"])
-        subcategory = random.choice(category_data["subcategories"])
-        
-        # Gerar data aleatória
-        transaction_date = self._random_date()
-        
-        # Tipo de transação
-        tx_type = random.choice(["debit", "pix", "credit"])
-        
-        return {
-            "id": str(uuid.uuid4()),
-            "date": transaction_date.isoformat(),
-            "datetime": datetime.combine(transaction_date, self._random_time()).isoformat(),
-            "amount": amount,
-            "description": self._generate_description(merchant, subcategory),
-            "transaction_type": tx_type,
-            "status": "completed",
-            "account_id": f"acc_{random.randint(1000, 9999)}",
-            "account_name": "Conta Corrente Principal",
-            "counterpart_name": merchant,
-            "counterpart_document": self._generate_document(),
-            "location": random.choice(LOCATIONS),
-            "channel": random.choice(["app", "website", "physical", "atm"]),
-            "category": category_name,
-            "subcategory": subcategory,
-            "tags": self._generate_tags(category_name, subcategory),
-            "notes": self._generate_notes()
-        }
-    
-    def _generate_income(self) -> Dict[str, Any]:
-        """Gera uma transação de receita."""
-        
-        # Escolher fonte de receita
-        source_name = self._weighted_choice(INCOME_SOURCES)
-        source_data = INCOME_SOURCES[source_name]
+        amounts = -np.round(self.rng.uniform(_CAT_RANGES[cat_idx, 0], _CAT_RANGES[cat_idx, 1]), 2)
+        merchants = self._pick_per_group(_CAT_MERCHANTS, cat_idx)
+        subcategories = self._pick_per_group(_CAT_SUBCATEGORIES, cat_idx)
+        descriptions = self._generate_descriptions(merchants, subcategories)
+        
+        # Gerar datas aleatórias
+        dates, datetimes = self._random_datetimes(n)
+        
+        # Identificadores (UUID v4) gerados em lote
+        ids = _batch_uuids(self.rng, n)
+        
+        # Tipo de transação, conta, documento, local e canal
+        tx_types = self._pick(_EXPENSE_TX_TYPES, n)
+        account_ids = self.rng.integers(1000, 10000, size=n).tolist()
+        documents = self._generate_documents(n)
+        locations = self._pick(_LOCATIONS, n)
+        channels = self._pick(_EXPENSE_CHANNELS, n)
+        category_names = [_CAT_NAMES[i] for i in cat_idx.tolist()]
+        tags = self._generate_tags(category_names, subcategories)
+        notes = self._generate_notes(n)
+        
+        return [
+            {
+                "id": tx_id,
+                "date": tx_date,
+                "datetime": tx_datetime,
+                "amount": amount,
+                "description": description,
+                "transaction_type": tx_type,
+                "status": "completed",
+                "account_id": f"acc_{account_id}",
+                "account_name": "Conta Corrente Principal",
+                "counterpart_name": merchant,
+                "counterpart_document": document,
+                "location": location,
+                "channel": channel,
+                "category": category_name,
+                "subcategory": subcategory,
+                "tags": tx_tags,
+                "notes": note
+            }
+            for tx_id, category_name, amount, description, merchant, subcategory, tx_date, tx_datetime,
+                tx_type, account_id, document, location, channel, tx_tags, note in zip(
+                ids, category_names, amounts.tolist(), descriptions, merchants, subcategories,
+                dates, datetimes, tx_types, account_ids, documents, locations, channels, tags, notes
+            )
+        ]
+    
+    def _generate_incomes(self, n: int) -> List[Dict[str, Any]]:
+        """Gera n transações de receita."""
+        
+        # Escolher fontes de receita
+        source_idx = self._weighted_indices(_INCOME_ALIAS, n)
         
         # Gerar valores
-        amount = round(random.uniform(*source_data["amount_range"]), 2)
-        merchant = random.choice(source_data["merchants"])
-        
-        # Gerar data aleatória
-        transaction_date = self._random_date()
-        
-        return {
-            "id": str(uuid.uuid4()),
-            "date": transaction_date.isoformat(),
-            "datetime": datetime.combine(transaction_date, self._random_time()).isoformat(),
-            "amount": amount,
-            "description": self._generate_income_description(merchant, source_name),
-            "transaction_type": "credit",
-            "status": "completed",
-            "account_id": f"acc_{random.randint(1000, 9999)}",
-            "account_name": "Conta Corrente Principal",
-            "counterpart_name": merchant,
-            "counterpart_document": self._generate_document(),
-            "location": random.choice(LOCATIONS),
-            "channel": random.choice(["transfer", "deposit", "pix"]),
-            "category": source_name,
-            "subcategory": None,
-            "tags": [source_name.lower(), "receita"],
-            "notes": None
-        }
+        amounts = np.round(self.rng.uniform(_INCOME_RANGES[source_idx, 0], _INCOME_RANGES[source_idx, 1]), 2)
+        merchants = self._pick_per_group(_INCOME_MERCHANTS, source_idx)
+        descriptions = self._generate_income_descriptions(merchants, source_idx)
+        
+        # Gerar datas aleatórias
+        dates, datetimes = self._random_datetimes(n)
+        
+        # Identificadores (UUID v4) gerados em lote
+        ids = _batch_uuids(self.rng, n)
+        
+        account_ids = self.rng.integers(1000, 10000, size=n).tolist()
+        documents = self._generate_documents(n)
+        locations = self._pick(_LOCATIONS, n)
+        channels = self._pick(_INCOME_CHANNELS, n)
+        
+        return [
+            {
+                "id": tx_id,
+                "date": tx_date,
+                "datetime": tx_datetime,
+                "amount": amount,
+                "description": description,
+                "transaction_type": "credit",
+                "status": "completed",
+                "account_id": f"acc_{account_id}",
+                "account_name": "Conta Corrente Principal",
+                "counterpart_name": merchant,
+                "counterpart_document": document,
+                "location": location,
+                "channel": channel,
+                "category": source_name,
+                "subcategory": None,
+                "tags": [source_name.lower(), "receita"],
+                "notes": None
+            }
+            for tx_id, source_name, amount, description, merchant, tx_date, tx_datetime,
+                account_id, document, location, channel in zip(
+                ids, [_INCOME_NAMES[i] for i in source_idx.tolist()], amounts.tolist(), descriptions, merchants,
+                dates, datetimes, account_ids, documents, locations, channels
+            )
+        ]
     
-    def _weighted_choice(self, choices_dict: Dict) -> str:
-        """Escolha ponderada baseada na frequência."""
+    def _weighted_indices(self, alias_table, n: int) -> np.ndarray:
+        """Sorteia n índices ponderados usando uma tabela alias pré-calculada."""
         
-        choices = list(choices_dict.keys())
-        weights = [choices_dict[choice]["frequency"] for choice in choices]
+        prob, alias = alias_table
+        k = self.rng.integers(0, len(prob), size=n)
         
-        return random.choices(choices, weights=weights)[0]
+        return np.where(self.rng.random(n) < prob[k], k, alias[k])
     
-    def _random_date(self) -> date:
-        """Gera data aleatória no período especificado."""
-        
-        delta = self.end_date - self.start_date
-        random_days = random.randint(0, delta.days)
+    def _pick(self, options: Tuple[str, ...], n: int) -> List[str]:
+        """Sorteia n itens (uniforme) de uma lista."""
         
-        return self.start_date + timedelta(days=random_days)
+        return [options[i] for i in self.rng.integers(len(options), size=n).tolist()]
     
-    def _random_time(self) -> datetime.time:
-        """Gera horário aleatório."""
+    def _pick_per_group(self, table, group_idx: np.ndarray) -> List[str]:
+        """Para cada linha, sorteia um item das opções do grupo sorteado (tabela de `_flatten_options`)."""
         
-        hour = random.randint(6, 23)
-        minute = random.randint(0, 59)
-        second = random.randint(0, 59)
+        flat, starts, lengths = table
+        offsets = (self.rng.random(len(group_idx)) * lengths[group_idx]).astype(np.int64)
         
-        return datetime.time(datetime(2024, 1, 1, hour, minute, second))
+        return flat[starts[group_idx] + offsets].tolist()
     
-    def _generate_description(self, merchant: str, subcategory: str) -> str:
-        """Gera descrição realista da transação."""
+    def _random_datetimes(self, n: int):
+        """Gera n datas no período e horários entre 06:00 e 23:59 (ISO)."""
         
-        templates = [
-            f"{merchant}",
-            f"{merchant} - {subcategory}",
-            f"Compra {merchant}",
-            f"Pagamento {merchant}",
-            f"{subcategory} - {merchant}"
-        ]
+        delta = self.end_date - self.start_date
+        days = np.datetime64(self.start_date, 'D') + self.rng.integers(0, delta.days + 1, size=n)
+        seconds = self.rng.integers(6 * 3600, 24 * 3600, size=n)
+        
+        # Formatação ISO da coluna inteira de uma vez
+        dates = np.datetime_as_string(days).tolist()
+        datetimes = np.datetime_as_string(days.astype('datetime64[s]') + seconds).tolist()
         
-        return random.choice(templates)
+        return dates, datetimes
     
-    def _generate_income_description(self, merchant: str, source: str) -> str:
-        """Gera descrição para receitas."""
+    def _generate_descriptions(self, merchants: List[str], subcategories: List[str]) -> List[str]:
+        """Gera descrições realistas, sorteando só o índice do modelo de cada linha."""
         
-        if source == "Salário":
-            return f"Salário {merchant}"
-        elif source == "Freelance":
-            return f"Freelance - {merchant}"
-        elif source == "Investimentos":
-            return f"Rendimento {merchant}"
-        else:
-            return f"Receita - {merchant}"
+        template_idx = self.rng.integers(len(_DESCRIPTION_FORMATS), size=len(merchants)).tolist()
+        
+        return [
+            _DESCRIPTION_FORMATS[i](merchant, subcategory)
+            for i, merchant, subcategory in zip(template_idx, merchants, subcategories)
+        ]
     
-    def _generate_document(self) -> str:
-        """Gera documento (CNPJ) fictício."""
+    def _generate_income_descriptions(self, merchants: List[str], source_idx: np.ndarray) -> List[str]:
+        """Gera descrições para receitas conforme a fonte."""
         
-        return f"{random.randint(10, 99)}.{random.randint(100, 999)}.{random.randint(100, 999)}/0001-{random.randint(10, 99)}"
+        return [_INCOME_DESCRIPTION_FORMATS[i](merchant) for i, merchant in zip(source_idx.tolist(), merchants)]
     
-    def _generate_tags(self, category: str, subcategory: str) -> List[str]:
-        """Gera tags para a transação."""
+    def _generate_documents(self, n: int) -> List[str]:
+        """Gera n documentos (CNPJ) fictícios."""
+        
+        blocks = self.rng.integers(_CNPJ_LOW, _CNPJ_HIGH, size=(n, len(_CNPJ_LOW)))
         
-        tags = [category.lower(), subcategory.lower()]
+        return [_CNPJ_FORMAT(*row) for row in blocks.tolist()]
+    
+    def _generate_tags(self, categories: List[str], subcategories: List[str]) -> List[List[str]]:
+        """Gera as tags das transações."""
         
-        # Adicionar tags extras ocasionalmente
-        if random.random() < 0.3:
-            extra_tags = ["essencial", "lazer", "urgente", "planejado", "imprevisto"]
-            tags.append(random.choice(extra_tags))
+        # Adicionar tags extras ocasionalmente (30% das transações)
+        extras = self._pick(_EXTRA_TAGS, len(categories))
+        has_extra = (self.rng.random(len(categories)) < 0.3).tolist()
         
-        return tags
+        return [
+            [category.lower(), subcategory.lower(), extra] if flag else [category.lower(), subcategory.lower()]
+            for category, subcategory, extra, flag in zip(categories, subcategories, extras, has_extra)
+        ]
     
-    def _generate_notes(self) -> str:
+    def _generate_notes(self, n: int) -> List[str]:
         """Gera notas ocasionais."""
         
-        if random.random() < 0.1:  # 10% das transações têm notas
-            notes = [
-                "Compra planejada",
-                "Gasto imprevisto",
-                "Promoção especial",
-                "Necessidade urgente",
-                "Investimento futuro"
-            ]
-            return random.choice(notes)
+        notes = self._pick(_NOTES, n)
+        has_note = (self.rng.random(n) < 0.1).tolist()  # 10% das transações têm notas
         
-        return None
+        return [note if flag else None for note, flag in zip(notes, has_note)]
     
     def _add_recurring_patterns(self):
         """Adiciona padrões recorrentes realistas."""
         
-        # Salário mensal
-        current_date = self.start_date
-        while current_date <= self.end_date:
-            # Salário no 5º dia útil do mês
-            salary_date = current_date.replace(day=5)
-            if salary_date <= self.end_date:
-                salary_transaction = {
-                    "id": str(uuid.uuid4()),
-                    "date": salary_date.isoformat(),
-                    "datetime": datetime.combine(salary_date, datetime.time(datetime(2024, 1, 1, 9, 0, 0))).isoformat(),
-                    "amount": round(random.uniform(4000, 6000), 2),
-                    "description": "Salário Mensal - Empresa ABC",
-                    "transaction_type": "credit",
-                    "status": "completed",
-                    "account_id": "acc_1001",
-                    "account_name": "Conta Corrente Principal",
-                    "counterpart_name": "Empresa ABC Ltda",
-                    "counterpart_document": "12.345.678/0001-90",
-                    "location": "São Paulo, SP",
-                    "channel": "transfer",
-                    "category": "Salário",
-                    "subcategory": None,
-                    "tags": ["salario", "mensal", "receita"],
-                    "notes": "Pagamento mensal"
-                }
-                self.transactions.append(salary_transaction)
-            
-            # Próximo mês
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
-        
-        # Netflix mensal
-        current_date = self.start_date
-        while current_date <= self.end_date:
-            netflix_date = current_date.replace(day=15)
-            if netflix_date <= self.end_date:
-                netflix_transaction = {
-                    "id": str(uuid.uuid4()),
-                    "date": netflix_date.isoformat(),
-                    "datetime": datetime.combine(netflix_date, datetime.time(datetime(2024, 1, 1, 20, 30, 0))).isoformat(),
-                    "amount": -39.90,
-                    "description": "Netflix Assinatura Mensal",
-                    "transaction_type": "debit",
-                    "status": "completed",
-                    "account_id": "acc_1001",
-                    "account_name": "Conta Corrente Principal",
-                    "counterpart_name": "Netflix",
-                    "counterpart_document": "13.456.789/0001-12",
-                    "location": "Online",
-                    "channel": "app",
-                    "category": "Lazer",
-                    "subcategory": "Streaming",
-                    "tags": ["netflix", "streaming", "mensal"],
-                    "notes": "Assinatura recorrente"
-                }
-                self.transactions.append(netflix_transaction)
-            
-            # Próximo mês
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
+        # Salário mensal (5º dia do mês)
+        salary_days = self._monthly_days(5)
+        self._add_recurring(salary_days, np.timedelta64(9 * 3600, 's'), {
+            "amount": None,
+            "description": "Salário Mensal - Empresa ABC",
+            "transaction_type": "credit",
+            "status": "completed",
+            "account_id": "acc_1001",
+            "account_name": "Conta Corrente Principal",
+            "counterpart_name": "Empresa ABC Ltda",
+            "counterpart_document": "12.345.678/0001-90",
+            "location": "São Paulo, SP",
+            "channel": "transfer",
+            "category": "Salário",
+            "subcategory": None,
+            "tags": ["salario", "mensal", "receita"],
+            "notes": "Pagamento mensal"
+        }, amounts=np.round(self.rng.uniform(4000, 6000, size=len(salary_days)), 2).tolist())
+        
+        # Netflix mensal (dia 15, valor fixo)
+        self._add_recurring(self._monthly_days(15), np.timedelta64(20 * 3600 + 30 * 60, 's'), {
+            "amount": -39.90,
+            "description": "Netflix Assinatura Mensal",
+            "transaction_type": "debit",
+            "status": "completed",
+            "account_id": "acc_1001",
+            "account_name": "Conta Corrente Principal",
+            "counterpart_name": "Netflix",
+            "counterpart_document": "13.456.789/0001-12",
+            "location": "Online",
+            "channel": "app",
+            "category": "Lazer",
+            "subcategory": "Streaming",
+            "tags": ["netflix", "streaming", "mensal"],
+            "notes": "Assinatura recorrente"
+        })
+    
+    def _monthly_days(self, day: int) -> np.ndarray:
+        """Datas no dia `day` de cada mês percorrido a partir de start_date, até end_date."""
+        
+        first = np.datetime64(self.start_date, 'M')
+        last = np.datetime64(self.end_date, 'M')
+        # O mês final só conta se o dia de start_date ainda couber nele
+        if self.start_date.day > self.end_date.day:
+            last -= 1
+        
+        days = np.arange(first, last + 1).astype('datetime64[D]') + (day - 1)
+        
+        return days[days <= np.datetime64(self.end_date)]
+    
+    def _add_recurring(self, days: np.ndarray, time_of_day: np.timedelta64, template: Dict[str, Any], amounts: List[float] = None):
+        """Adiciona uma transação (cópia do modelo) para cada data em `days`."""
+        
+        n = len(days)
+        dates = np.datetime_as_string(days).tolist()
+        datetimes = np.datetime_as_string(days + time_of_day).tolist()
+        
+        self.transactions.extend(
+            {
+                "id": tx_id,
+                "date": tx_date,
+                "datetime": tx_datetime,
+                **template,
+                "amount": amount,
+                "tags": list(template["tags"])
+            }
+            for tx_id, tx_date, tx_datetime, amount in zip(
+                _batch_uuids(self.rng, n), dates, datetimes, amounts or [template["amount"]] * n
+            )
+        )
     
     def save_to_csv(self, filename: str):
         """Salva transações em arquivo CSV."""
         
         print(f"Salvando {len(self.transactions)} transações em {filename}")
         
-        fieldnames = [
-            "id", "date", "datetime", "amount", "description", "transaction_type",
-            "status", "account_id", "account_name", "counterpart_name",
-            "counterpart_document", "location", "channel", "category",
-            "subcategory", "tags", "notes"
-        ]
-        
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+            writer = csv.writer(csvfile)
+            writer.writerow(FIELDNAMES)
+            writer.writerows(self._rows())
+    
+    def _rows(self):
+        """Transações como tuplas na ordem de FIELDNAMES, com as tags convertidas para string."""
+        
+        get_fields = itemgetter(*FIELDNAMES[:-2])
+        
+        return (
+            (*get_fields(tx), ','.join(tx['tags']) if tx['tags'] else '', tx['notes'])
+            for tx in self.transactions
+        )
+    
+    def save_to_sqlite(self, path: str, batch_size: int = 10000):
+        """Salva transações numa tabela SQLite com INSERTs de várias linhas, numa única transação."""
+        
+        print(f"Salvando {len(self.transactions)} transações em {path} (SQLite)")
+        
+        # Linhas por INSERT, respeitando o limite de parâmetros do SQLite
+        rows_per_insert = max(1, min(batch_size, _SQLITE_MAX_VARIABLES // len(FIELDNAMES)))
+        placeholders = f"({', '.join('?' * len(FIELDNAMES))})"
+        insert = f"INSERT INTO transactions ({', '.join(FIELDNAMES)}) VALUES "
+        
+        conn = sqlite3.connect(path, isolation_level=None)
+        try:
+            # Carga em lote: sem fsync por comando
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("PRAGMA journal_mode = MEMORY")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transactions ("
+                "id TEXT PRIMARY KEY, date TEXT, datetime TEXT, amount REAL, description TEXT, "
+                "transaction_type TEXT, status TEXT, account_id TEXT, account_name TEXT, "
+                "counterpart_name TEXT, counterpart_document TEXT, location TEXT, channel TEXT, "
+                "category TEXT, subcategory TEXT, tags TEXT, notes TEXT)"
+            )
             
-            for transaction in self.transactions:
-                # Converter tags para string
-                row = transaction.copy()
-                if row['tags']:
-                    row['tags'] = ','.join(row['tags'])
-                
-                writer.writerow(row)
+            rows = list(self._rows())
+            conn.execute("BEGIN")
+            for start in range(0, len(rows), rows_per_insert):
+                chunk = rows[start:start + rows_per_insert]
+                conn.execute(insert + ", ".join([placeholders] * len(chunk)), [value for row in chunk for value in row])
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
     
     def save_to_json(self, filename: str):
         """Salva transações em arquivo JSON."""
         
         print(f"Salvando {len(self.transactions)} transações em {filename}")
         
+        # orjson serializa direto para UTF-8, bem mais rápido que o json da stdlib
+        if ORJSON_AVAILABLE:
+            with open(filename, 'wb') as jsonfile:
+                jsonfile.write(orjson.dumps(self.transactions, option=orjson.OPT_INDENT_2))
+            return
+        
         with open(filename, 'w', encoding='utf-8') as jsonfile:
             json.dump(self.transactions, jsonfile, indent=2, ensure_ascii=False)
     
+    def save_to_parquet(self, filename: str):
+        """Salva transações em arquivo Parquet (colunar, comprimido com zstd)."""
+        
+        print(f"Salvando {len(self.transactions)} transações em {filename}")
+        
+        table = pa.Table.from_pylist(self.transactions)
+        pq.write_table(
+            table, filename, compression='zstd',
+            use_dictionary=['category', 'subcategory', 'channel', 'location', 'account_id', 'transaction_type']
+        )
+    
     def print_summary(self):
         """Imprime resumo das transações geradas."""
         
         total_transactions = len(self.transactions)
-        total_income = sum(tx['amount'] for tx in self.transactions if tx['amount'] > 0)
-        total_expenses = sum(abs(tx['amount']) for tx in self.transactions if tx['amount'] < 0)
+        amounts = np.fromiter((tx['amount'] for tx in self.transactions), dtype=float, count=total_transactions)
+        total_income = amounts[amounts > 0].sum()
+        total_expenses = np.abs(amounts[amounts < 0]).sum()
         net_amount = total_income - total_expenses
         
         print(f"\n=== Resumo das Transações Geradas ===")
@@ -450,19 +683,14 @@ class SyntheticDataGenerator:
         print(f"Despesas: R$ {total_expenses:,.2f}")
         print(f"Saldo líquido: R$ {net_amount:,.2f}")
         
-        # Resumo por categoria
-        categories_summary = {}
-        for tx in self.transactions:
-            category = tx['category']
-            if category not in categories_summary:
-                categories_summary[category] = {'count': 0, 'amount': 0}
-            
-            categories_summary[category]['count'] += 1
-            categories_summary[category]['amount'] += abs(tx['amount'])
+        # Resumo por categoria (contagem e soma em lote por índice de categoria)
+        categories, cat_idx = np.unique([tx['category'] for tx in self.transactions], return_inverse=True)
+        counts = np.bincount(cat_idx, minlength=len(categories))
+        totals = np.bincount(cat_idx, weights=np.abs(amounts), minlength=len(categories))
         
         print(f"\n=== Resumo por Categoria ===")
-        for category, data in sorted(categories_summary.items(), key=lambda x: x[1]['amount'], reverse=True):
-            print(f"{category}: {data['count']} transações, R$ {data['amount']:,.2f}")
+        for i in np.argsort(-totals, kind='stable').tolist():
+            print(f"{categories[i]}: {counts[i]} transações, R$ {totals[i]:,.2f}")
 
 
 def main():
@@ -472,17 +700,27 @@ def main():
     parser.add_argument("--transactions", "-t", type=int, default=1000, help="Número de transações a gerar")
     parser.add_argument("--days", "-d", type=int, default=365, help="Número de dias no passado")
     parser.add_argument("--output", "-o", default="sample_transactions", help="Nome base dos arquivos de saída")
-    parser.add_argument("--format", "-f", choices=["csv", "json", "both"], default="both", help="Formato de saída")
+    parser.add_argument("--format", "-f", choices=["csv", "json", "both", "parquet"], default="both", help="Formato de saída")
+    parser.add_argument("--workers", "-w", type=int, default=1, help="Número de processos para gerar as transações")
+    parser.add_argument("--seed", "-s", type=int, default=None, help="Semente para dados reproduzíveis")
+    parser.add_argument("--sink", help="Banco de destino adicional (ex.: sqlite://transacoes.db)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Linhas por INSERT ao gravar no banco")
     
     args = parser.parse_args()
     
+    if args.format == "parquet" and not PYARROW_AVAILABLE:
+        parser.error("o formato parquet requer pyarrow (pip install pyarrow)")
+    
+    if args.sink and not args.sink.startswith("sqlite://"):
+        parser.error("--sink aceita apenas sqlite://caminho")
+    
     # Calcular datas
     end_date = date.today()
     start_date = end_date - timedelta(days=args.days)
     
     # Gerar dados
-    generator = SyntheticDataGenerator(start_date, end_date)
-    transactions = generator.generate_transactions(args.transactions)
+    generator = SyntheticDataGenerator(start_date, end_date, args.seed)
+    transactions = generator.generate_transactions(args.transactions, args.workers)
     
     # Salvar arquivos
     if args.format in ["csv", "both"]:
@@ -491,11 +729,20 @@ def main():
     if args.format in ["json", "both"]:
         generator.save_to_json(f"{args.output}.json")
     
+    if args.format == "parquet":
+        generator.save_to_parquet(f"{args.output}.parquet")
+    
+    if args.sink:
+        generator.save_to_sqlite(args.sink.removeprefix("sqlite://"), args.batch_size)
+    
     # Mostrar resumo
     generator.print_summary()
     
     print(f"\n✅ Dados sintéticos gerados com sucesso!")
-    print(f"Arquivos salvos: {args.output}.csv e/ou {args.output}.json")
+    if args.format == "parquet":
+        print(f"Arquivo salvo: {args.output}.parquet")
+    else:
+        print(f"Arquivos salvos: {args.output}.csv e/ou {args.output}.json")
 
 
 if __name__ == "__main__":
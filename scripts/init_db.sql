@@ -173,6 +173,8 @@ ON CONFLICT DO NOTHING;
 -- Criar índices adicionais para performance
 CREATE INDEX IF NOT EXISTS idx_transactions_date_desc ON transactions (date DESC);
 CREATE INDEX IF NOT EXISTS idx_transactions_amount_abs ON transactions (abs(amount));
+CREATE INDEX IF NOT EXISTS idx_date_covering ON transactions (date) INCLUDE (amount, category_id, counterpart_name);
+CREATE INDEX IF NOT EXISTS idx_date_expenses ON transactions (date) WHERE amount < 0;
 CREATE INDEX IF NOT EXISTS idx_transactions_description_trgm ON transactions USING gin (description gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_categories_name_trgm ON categories USING gin (name gin_trgm_ops);
 
@@ -219,6 +221,20 @@ LEFT JOIN categories c ON t.category_id = c.id
 GROUP BY DATE_TRUNC('month', date), c.category_type, c.name
 ORDER BY month DESC, total_amount DESC;
 
+-- Agregados mensais pré-calculados (a API os atualiza em segundo plano a cada hora)
+CREATE MATERIALIZED VIEW IF NOT EXISTS monthly_totals AS
+SELECT 
+    DATE_TRUNC('month', date)::date as ym,
+    category_id,
+    SUM(amount) FILTER (WHERE amount > 0) as income,
+    SUM(-amount) FILTER (WHERE amount < 0) as expenses,
+    COUNT(*) as cnt
+FROM transactions
+GROUP BY 1, 2;
+
+-- Índice único necessário para REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_monthly_totals_ym_category ON monthly_totals (ym, category_id);
+
 -- Log de inicialização
 INSERT INTO pg_stat_statements_reset();
 
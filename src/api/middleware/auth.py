@@ -2,33 +2,74 @@
 Authentication Middleware for Finance App API.
 """
 
+import re
+import time
 import jwt
+import redis
+from collections import OrderedDict, deque
+from hashlib import blake2b
 from typing import Callable, Optional
 from fastapi import Request, Response, HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 from loguru import logger
 
 from src.config import settings
+from src.models import get_async_redis
+
+
+# Public endpoints that don't require authentication
+PUBLIC_ENDPOINTS = frozenset({
+    "/",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/health",
+    "/health/",
+    "/health/check",
+    "/info",
+    "/api/v1/auth/login",
+    "/api/v1/auth/register",
+    "/api/v1/auth/refresh",
+})
+
+# Public path prefixes (health checks and static files)
+_PUBLIC_PREFIX_RE = re.compile(r"/(?:health|static)")
+
+# Decoded JWT payloads keyed by token hash: {digest: (payload, exp)}
+_TOKEN_CACHE_SIZE = 8192
+_token_cache = {}
+
+
+def _decode_token(token: str) -> dict:
+    """Decode and validate a JWT, reusing the payload until the token expires."""
+    key = blake2b(token.encode(), digest_size=16).digest()
+    
+    cached = _token_cache.get(key)
+    if cached is not None:
+        payload, exp = cached
+        if time.time() < exp:
+            return payload
+        del _token_cache[key]
+    
+    payload = jwt.decode(
+        token,
+        settings.JWT_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM]
+    )
+    
+    # Only tokens with an expiry are cached; evict the oldest entry when full
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        if len(_token_cache) >= _TOKEN_CACHE_SIZE:
+            del _token_cache[next(iter(_token_cache))]
+        _token_cache[key] = (payload, exp)
+    
+    return payload
 
 
 class AuthMiddleware(BaseHTTPMiddleware):
     """Middleware for JWT authentication."""
     
-    # Public endpoints that don't require authentication
-    PUBLIC_ENDPOINTS = {
-        "/",
-        "/docs",
-        "/redoc",
-        "/openapi.json",
-        "/health",
-        "/health/",
-        "/health/check",
-        "/info",
-        "/api/v1/auth/login",
-        "/api/v1/auth/register",
-        "/api/v1/auth/refresh",
-    }
-    
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request and validate authentication."""
         
@@ -56,12 +97,8 @@ class AuthMiddleware(BaseHTTPMiddleware):
             )
         
         try:
-            # Decode and validate JWT
-            payload = jwt.decode(
-                token,
-                settings.JWT_SECRET_KEY,
-                algorithms=[settings.JWT_ALGORITHM]
-            )
+            # Decode and validate JWT (cached until the token expires)
+            payload = _decode_token(token)
             
             # Set user info in request state
             request.state.user = {
@@ -91,31 +128,22 @@ class AuthMiddleware(BaseHTTPMiddleware):
     
     def _is_public_endpoint(self, path: str) -> bool:
         """Check if endpoint is public."""
-        # Exact match
-        if path in self.PUBLIC_ENDPOINTS:
-            return True
-        
-        # Pattern matching for health endpoints
-        if path.startswith("/health"):
-            return True
-        
-        # Pattern matching for static files
-        if path.startswith("/static"):
-            return True
-        
-        return False
+        # Exact match, then prefix match for health endpoints and static files
+        return path in PUBLIC_ENDPOINTS or _PUBLIC_PREFIX_RE.match(path) is not None
     
     def _extract_token(self, request: Request) -> Optional[str]:
         """Extract JWT token from request."""
         # Check Authorization header
         authorization = request.headers.get("Authorization")
         if authorization and authorization.startswith("Bearer "):
-            return authorization[7:]  # Remove "Bearer " prefix
+            return authorization.removeprefix("Bearer ")
         
-        # Check query parameter (for WebSocket or special cases)
-        token = request.query_params.get("token")
-        if token:
-            return token
+        # Check query parameter (for WebSocket or special cases); only parse the
+        # query string when it can contain a token
+        if b"token=" in request.scope.get("query_string", b""):
+            token = request.query_params.get("token")
+            if token:
+                return token
         
         # Check cookie (if using cookie-based auth)
         token = request.cookies.get("access_token")
@@ -126,12 +154,21 @@ class AuthMiddleware(BaseHTTPMiddleware):
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware."""
+    """Rate limiting middleware backed by Redis, shared by all workers."""
+    
+    # Maximum number of client IPs tracked at once (least recently seen are evicted)
+    MAX_TRACKED_CLIENTS = 100_000
+    
+    # Seconds to use the in-process limiter only, after a Redis error, before trying Redis again
+    REDIS_RETRY_INTERVAL = 30
     
     def __init__(self, app, requests_per_minute: int = 60):
         super().__init__(app)
         self.requests_per_minute = requests_per_minute
-        self.client_requests = {}  # In production, use Redis
+        # Per-client request timestamps within the last minute, used only when Redis is unavailable
+        self.client_requests = OrderedDict()
+        # Monotonic time before which Redis is skipped (0 while Redis is healthy)
+        self._redis_retry_at = 0.0
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request and apply rate limiting."""
@@ -143,19 +180,41 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Get client IP
         client_ip = self._get_client_ip(request)
         
-        # Check rate limit
-        if self._is_rate_limited(client_ip):
+        # Check rate limit (also records the request)
+        if await self._check_rate_limit(client_ip):
             raise HTTPException(
                 status_code=429,
                 detail="Rate limit exceeded. Please try again later.",
                 headers={"Retry-After": "60"}
             )
         
-        # Record request
-        self._record_request(client_ip)
-        
         return await call_next(request)
     
+    async def _check_rate_limit(self, client_ip: str) -> bool:
+        """Count the request in the client's current one-minute window and check the limit."""
+        if time.monotonic() >= self._redis_retry_at:
+            key = f"rl:{client_ip}:{int(time.time() // 60)}"
+            
+            try:
+                # INCR + EXPIRE in a single round-trip
+                async with get_async_redis().pipeline(transaction=False) as pipe:
+                    count, _ = await pipe.incr(key).expire(key, 60).execute()
+                if self._redis_retry_at:
+                    logger.info("Redis rate limit available again")
+                    self._redis_retry_at = 0.0
+                return count > self.requests_per_minute
+            except redis.RedisError as e:
+                # Log once per outage; retries are spaced by REDIS_RETRY_INTERVAL
+                if not self._redis_retry_at:
+                    logger.warning(f"Redis rate limit unavailable, using in-process limiter: {e}")
+                self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_INTERVAL
+        
+        if self._is_rate_limited(client_ip):
+            return True
+        
+        self._record_request(client_ip)
+        return False
+    
     def _get_client_ip(self, request: Request) -> str:
         """Get client IP address."""
         forwarded_for = request.headers.get("x-forwarded-for")
@@ -173,41 +232,35 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     
     def _is_rate_limited(self, client_ip: str) -> bool:
         """Check if client is rate limited."""
-        import time
-        
-        current_time = time.time()
-        window_start = current_time - 60  # 1 minute window
+        window_start = time.time() - 60  # 1 minute window
         
         # Get client request history
-        if client_ip not in self.client_requests:
+        requests = self.client_requests.get(client_ip)
+        if not requests:
             return False
         
-        # Filter requests within the time window
-        recent_requests = [
-            req_time for req_time in self.client_requests[client_ip]
-            if req_time > window_start
-        ]
+        # Drop requests that fell out of the time window
+        while requests and requests[0] <= window_start:
+            requests.popleft()
         
-        return len(recent_requests) >= self.requests_per_minute
+        return len(requests) >= self.requests_per_minute
     
     def _record_request(self, client_ip: str):
         """Record a request for rate limiting."""
-        import time
+        requests = self.client_requests.get(client_ip)
         
-        current_time = time.time()
-        
-        if client_ip not in self.client_requests:
-            self.client_requests[client_ip] = []
+        if requests is None:
+            # Evict the least recently seen client when full
+            if len(self.client_requests) >= self.MAX_TRACKED_CLIENTS:
+                self.client_requests.popitem(last=False)
+            
+            # Only the last `requests_per_minute` timestamps matter for the check
+            requests = self.client_requests[client_ip] = deque(maxlen=self.requests_per_minute)
+        else:
+            self.client_requests.move_to_end(client_ip)
         
         # Add current request
-        self.client_requests[client_ip].append(current_time)
-        
-        # Clean old requests (keep only last hour)
-        hour_ago = current_time - 3600
-        self.client_requests[client_ip] = [
-            req_time for req_time in self.client_requests[client_ip]
-            if req_time > hour_ago
-        ]
+        requests.append(time.time())
 
 
 def get_current_user(request: Request) -> dict:
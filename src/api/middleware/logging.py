@@ -2,95 +2,229 @@
 Logging Middleware for Finance App API.
 """
 
+import asyncio
+import itertools
+import math
+import os
+import sys
 import time
-import uuid
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from collections import deque
+from typing import Optional
+from starlette.datastructures import URL, Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from loguru import logger
 import json
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for request/response logging."""
+def setup_logging(log_file: Optional[str] = None, level: str = "INFO"):
+    """Configure loguru sinks with enqueue=True so formatting and I/O run in a background thread.
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    Call once at application startup, and await ``shutdown_logging()`` on shutdown.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level=level, enqueue=True, backtrace=False, diagnose=False)
+    
+    if log_file:
+        logger.add(log_file, level=level, enqueue=True, backtrace=False, diagnose=False, rotation="10 MB")
+
+
+async def shutdown_logging():
+    """Flush queued log messages before the application exits."""
+    await logger.complete()
+
+
+class LoggingMiddleware:
+    """Middleware for request/response logging (pure ASGI).
+    
+    Info-level access lines are buffered and written in batches (every
+    ``flush_interval`` seconds or ``flush_size`` lines); warnings and errors
+    are logged immediately. Request bodies are only read and previewed when
+    ``debug`` is enabled.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        debug: bool = False,
+        flush_interval: float = 0.2,
+        flush_size: int = 256,
+        max_buffer: int = 4096,
+    ):
+        self.app = app
+        self.debug = debug
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        # Ring buffer: the oldest lines are dropped if the flusher falls behind
+        self._buffer = deque(maxlen=max_buffer)
+        self._flusher_task = None
+        # Request IDs: per-worker random prefix + counter (log correlation only, not security)
+        self._request_id_prefix = f"{os.getpid():x}-{os.urandom(4).hex()}-"
+        self._request_ids = itertools.count()
+    
+    def _log_info(self, message: str):
+        """Buffer an info-level access line, flushing when the batch is full."""
+        self._buffer.append(message)
+        
+        if len(self._buffer) >= self.flush_size:
+            self._flush()
+        elif self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.get_running_loop().create_task(self._flusher())
+    
+    def _flush(self):
+        """Write all buffered lines in a single log call."""
+        if self._buffer:
+            lines = list(self._buffer)
+            self._buffer.clear()
+            logger.info("\n".join(lines))
+    
+    async def _flusher(self):
+        """Periodically flush the access-log buffer, exiting once it stays empty
+        for a whole interval (``_log_info`` restarts it on the next line)."""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                if not self._buffer:
+                    return
+                self._flush()
+        finally:
+            self._flush()
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request and log details."""
         
-        # Generate request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Generate request ID (exposed as request.state.request_id)
+        request_id = f"{self._request_id_prefix}{next(self._request_ids):x}"
+        scope.setdefault("state", {})["request_id"] = request_id
+        request_id_header = (b"x-request-id", request_id.encode("ascii"))
+        
+        # Start timing (monotonic, integer nanoseconds)
+        start_ns = time.monotonic_ns()
         
-        # Start timing
-        start_time = time.time()
+        method = scope["method"]
+        url = str(URL(scope=scope))
         
-        # Log request
-        await self._log_request(request, request_id)
+        # Log request (in debug mode the body is read up front and replayed to the app)
+        receive = await self._log_request(scope, receive, request_id, method, url)
+        
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time_ns = time.monotonic_ns() - start_ns
+                
+                # Add headers (appended to the raw header list in place)
+                headers = message.setdefault("headers", [])
+                if not isinstance(headers, list):
+                    headers = message["headers"] = list(headers)
+                headers.append(request_id_header)
+                headers.append((b"x-process-time", f"{process_time_ns / 1e9:.6f}".encode("ascii")))
+            
+            await send(message)
         
         # Process request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # Log error
-            process_time = time.time() - start_time
+            process_time_ns = time.monotonic_ns() - start_ns
+            self._flush()
             logger.error(
                 f"Request failed | "
                 f"ID: {request_id} | "
-                f"Method: {request.method} | "
-                f"URL: {request.url} | "
+                f"Method: {method} | "
+                f"URL: {url} | "
                 f"Error: {str(e)} | "
-                f"Duration: {process_time:.3f}s"
+                f"Duration: {process_time_ns / 1e9:.3f}s"
             )
             raise
         
         # Calculate process time
-        process_time = time.time() - start_time
-        
-        # Add headers
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Process-Time"] = str(process_time)
+        process_time_ns = time.monotonic_ns() - start_ns
         
         # Log response
-        await self._log_response(request, response, request_id, process_time)
-        
-        return response
+        self._log_response(status_code, request_id, method, url, process_time_ns)
     
-    async def _log_request(self, request: Request, request_id: str):
-        """Log incoming request."""
+    async def _log_request(self, scope: Scope, receive: Receive, request_id: str, method: str, url: str) -> Receive:
+        """Log incoming request and return the receive callable the app should use."""
         
         # Get client info
-        client_ip = self._get_client_ip(request)
-        user_agent = request.headers.get("user-agent", "Unknown")
+        headers = Headers(scope=scope)
+        client_ip = self._get_client_ip(scope, headers)
+        user_agent = headers.get("user-agent", "Unknown")
         
-        # Get request body for POST/PUT requests (if small enough)
+        # Get request body for POST/PUT requests (if small enough, debug only)
         body_preview = ""
-        if request.method in ["POST", "PUT", "PATCH"]:
-            try:
-                body = await request.body()
-                if len(body) < 1000:  # Only log small bodies
-                    body_preview = body.decode("utf-8")[:500]
-                else:
-                    body_preview = f"<large body: {len(body)} bytes>"
-            except Exception:
-                body_preview = "<unable to read body>"
-        
-        logger.info(
+        if self.debug and method in ("POST", "PUT", "PATCH"):
+            content_length = headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) >= 1000:
+                # Large bodies are never read here, so uploads keep streaming
+                body_preview = f"<large body: {content_length} bytes>"
+            else:
+                try:
+                    # Read at most ~1000 bytes; the rest is left for the app
+                    messages, body = await self._read_body(receive, limit=1000)
+                    receive = self._replay(messages, receive)
+                    if len(body) < 1000:  # Only log small bodies
+                        body_preview = body.decode("utf-8", errors="replace")[:500]
+                    else:
+                        body_preview = f"<large body: >= {len(body)} bytes>"
+                except Exception:
+                    body_preview = "<unable to read body>"
+        
+        self._log_info(
             f"Request started | "
             f"ID: {request_id} | "
-            f"Method: {request.method} | "
-            f"URL: {request.url} | "
+            f"Method: {method} | "
+            f"URL: {url} | "
             f"Client: {client_ip} | "
             f"User-Agent: {user_agent[:100]} | "
             f"Body: {body_preview}"
         )
+        
+        return receive
+    
+    async def _read_body(self, receive: Receive, limit: int):
+        """Read request body messages until the end or at least ``limit`` bytes, keeping them for replay."""
+        
+        messages = []
+        body = b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body", False) or len(body) >= limit:
+                break
+        
+        return messages, body
+    
+    def _replay(self, messages: list, receive: Receive) -> Receive:
+        """Receive callable that returns the already-read messages before the original ones."""
+        
+        pending = list(messages)
+        
+        async def replay() -> Message:
+            if pending:
+                return pending.pop(0)
+            return await receive()
+        
+        return replay
     
-    async def _log_response(self, request: Request, response: Response, request_id: str, process_time: float):
-        """Log outgoing response."""
+    def _log_response(self, status_code: int, request_id: str, method: str, url: str, process_time_ns: int):
+        """Log outgoing response (process time in nanoseconds)."""
         
         # Determine log level based on status code
-        if response.status_code >= 500:
+        if status_code >= 500:
             log_level = "error"
-        elif response.status_code >= 400:
+        elif status_code >= 400:
             log_level = "warning"
         else:
             log_level = "info"
@@ -99,77 +233,107 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         log_message = (
             f"Request completed | "
             f"ID: {request_id} | "
-            f"Method: {request.method} | "
-            f"URL: {request.url} | "
-            f"Status: {response.status_code} | "
-            f"Duration: {process_time:.3f}s"
+            f"Method: {method} | "
+            f"URL: {url} | "
+            f"Status: {status_code} | "
+            f"Duration: {process_time_ns / 1e9:.3f}s"
         )
         
+        # Flush buffered lines first so warnings/errors keep their order
         if log_level == "error":
+            self._flush()
             logger.error(log_message)
         elif log_level == "warning":
+            self._flush()
             logger.warning(log_message)
         else:
-            logger.info(log_message)
+            self._log_info(log_message)
     
-    def _get_client_ip(self, request: Request) -> str:
+    def _get_client_ip(self, scope: Scope, headers: Headers) -> str:
         """Get client IP address."""
         # Check for forwarded headers first
-        forwarded_for = request.headers.get("x-forwarded-for")
+        forwarded_for = headers.get("x-forwarded-for")
         if forwarded_for:
             return forwarded_for.split(",")[0].strip()
         
-        real_ip = request.headers.get("x-real-ip")
+        real_ip = headers.get("x-real-ip")
         if real_ip:
             return real_ip
         
         # Fallback to direct client
-        if hasattr(request.client, "host"):
-            return request.client.host
+        client = scope.get("client")
+        if client:
+            return client[0]
         
         return "unknown"
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    """Middleware for collecting metrics."""
+class MetricsMiddleware:
+    """Middleware for collecting metrics (pure ASGI)."""
     
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.request_count = 0
-        self.request_times = []
+        # Last 1000 request times (nanoseconds), with running sum/min/max over them
+        self.request_times = deque(maxlen=1000)
+        self._sum = 0
+        self._min = math.inf
+        self._max = -math.inf
         self.error_count = 0
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def _record_time(self, process_time_ns: int):
+        """Append a request time (nanoseconds) and update the running aggregates."""
+        times = self.request_times
+        evicted = times[0] if len(times) == times.maxlen else None
+        times.append(process_time_ns)
+        # Integer nanoseconds: the running sum stays exact
+        self._sum += process_time_ns
+        
+        if evicted is not None:
+            self._sum -= evicted
+            # Recompute only when the evicted sample was an extreme
+            if evicted == self._min or evicted == self._max:
+                self._min = min(times)
+                self._max = max(times)
+                return
+        
+        self._min = min(self._min, process_time_ns)
+        self._max = max(self._max, process_time_ns)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Process request and collect metrics."""
         
-        start_time = time.time()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_ns = time.monotonic_ns()
         self.request_count += 1
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
             
             # Record timing
-            process_time = time.time() - start_time
-            self.request_times.append(process_time)
-            
-            # Keep only last 1000 request times
-            if len(self.request_times) > 1000:
-                self.request_times = self.request_times[-1000:]
+            self._record_time(time.monotonic_ns() - start_ns)
             
             # Count errors
-            if response.status_code >= 400:
+            if status_code >= 400:
                 self.error_count += 1
-            
-            return response
-            
+        
         except Exception as e:
             self.error_count += 1
-            process_time = time.time() - start_time
-            self.request_times.append(process_time)
+            self._record_time(time.monotonic_ns() - start_ns)
             raise
     
     def get_metrics(self) -> dict:
-        """Get current metrics."""
+        """Get current metrics (response times in seconds)."""
         if not self.request_times:
             return {
                 "request_count": self.request_count,
@@ -183,9 +347,8 @@ class MetricsMiddleware(BaseHTTPMiddleware):
             "request_count": self.request_count,
             "error_count": self.error_count,
             "error_rate": self.error_count / self.request_count if self.request_count > 0 else 0,
-            "avg_response_time": sum(self.request_times) / len(self.request_times),
-            "min_response_time": min(self.request_times),
-            "max_response_time": max(self.request_times),
+            "avg_response_time": self._sum / len(self.request_times) / 1e9,
+            "min_response_time": self._min / 1e9,
+            "max_response_time": self._max / 1e9,
             "recent_requests": len(self.request_times)
         }
-
@@ -2,17 +2,241 @@
 Analytics Routes for Finance App API.
 """
 
+import asyncio
+import time
 from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, extract, select, cast, table, column, text, Date, Integer, Numeric
+from loguru import logger
 
-from src.models import get_db, Transaction, Category, TransactionType
+from src.models import get_async_db, AsyncSessionLocal, Transaction, Category, TransactionType
 from src.api.middleware.auth import get_current_user
 
-router = APIRouter()
+# orjson renders responses in C instead of json.dumps walking every dict
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Day names indexed by day of week (0 = Sunday)
+DAY_NAMES = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+
+# Browser/proxy caching for the cached aggregate endpoints
+CACHE_HEADERS = {"Cache-Control": "max-age=30"}
+
+
+# Shared column expressions, built once and reused by every statement (keeps
+# the generated SQL, and so the compiled-statement cache keys, identical)
+abs_amount = func.abs(Transaction.amount)
+total_abs_amount = func.sum(abs_amount).label('total_amount')
+
+
+async def _fetch(statement):
+    """Execute a statement in its own session and return all rows."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(statement)
+        return result.all()
+
+
+async def _fetch_all(*statements):
+    """Run independent statements concurrently (one session each, since an
+    AsyncSession cannot run concurrent queries) and return their rows in order."""
+    return await asyncio.gather(*(_fetch(statement) for statement in statements))
+
+
+def _with_percentage(statement):
+    """Wrap a grouped (and limited) statement, adding each row's share of the
+    returned total_amount as a 'percentage' column computed in SQL."""
+    ranked = statement.subquery()
+    return select(
+        ranked,
+        func.coalesce(
+            ranked.c.total_amount * 100.0 / func.nullif(func.sum(ranked.c.total_amount).over(), 0), 0
+        ).label('percentage')
+    ).order_by(ranked.c.total_amount.desc())
+
+
+# Monthly aggregates precomputed by the monthly_totals materialized view (scripts/init_db.sql)
+monthly_totals = table(
+    "monthly_totals",
+    column("ym", Date),
+    column("category_id", Integer),
+    column("income", Numeric),
+    column("expenses", Numeric),
+    column("cnt", Integer),
+)
+
+MONTHLY_TOTALS_REFRESH_INTERVAL = 3600
+
+
+def _month_after(day: date) -> date:
+    """First day of the month following day's month."""
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _closed_months_stmt(start: date, end: date, category_id: Optional[int] = None):
+    """Monthly income/expenses/count from monthly_totals for whole months in [start, end)."""
+    statement = select(
+        extract('year', monthly_totals.c.ym).label('year'),
+        extract('month', monthly_totals.c.ym).label('month'),
+        func.sum(monthly_totals.c.income).label('income'),
+        func.sum(monthly_totals.c.expenses).label('expenses'),
+        cast(func.sum(monthly_totals.c.cnt), Integer).label('count')
+    ).where(
+        monthly_totals.c.ym >= start,
+        monthly_totals.c.ym < end
+    ).group_by(monthly_totals.c.ym)
+    
+    if category_id:
+        statement = statement.where(monthly_totals.c.category_id == category_id)
+    
+    return statement
+
+
+# Monotonic times of this worker's last successful and last failed refresh
+_monthly_totals_refreshed_at: Optional[float] = None
+_monthly_totals_failed_at: Optional[float] = None
+_monthly_totals_task: Optional[asyncio.Task] = None
+
+# Seconds to wait after a failed refresh (e.g. the view does not exist) before retrying
+MONTHLY_TOTALS_RETRY_INTERVAL = 300
+
+
+async def refresh_monthly_totals():
+    """Refresh the monthly_totals materialized view without blocking readers."""
+    global _monthly_totals_refreshed_at, _monthly_totals_failed_at
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY monthly_totals"))
+            await session.commit()
+    except Exception:
+        _monthly_totals_failed_at = time.monotonic()
+        raise
+    _monthly_totals_refreshed_at = time.monotonic()
+    _monthly_totals_failed_at = None
+    invalidate_analytics_cache()
+
+
+async def _refresh_monthly_totals_logged():
+    """Refresh monthly_totals, logging (not raising) failures."""
+    try:
+        await refresh_monthly_totals()
+    except Exception as e:
+        logger.error(f"Failed to refresh monthly_totals: {e}")
+
+
+async def monthly_totals_refresher(interval: float = MONTHLY_TOTALS_REFRESH_INTERVAL):
+    """Refresh monthly_totals periodically (start once at application startup)."""
+    while True:
+        await _refresh_monthly_totals_logged()
+        await asyncio.sleep(interval)
+
+
+def _monthly_totals_fresh() -> bool:
+    """Whether monthly_totals was refreshed within MONTHLY_TOTALS_REFRESH_INTERVAL.
+    
+    When it was not, a background refresh is scheduled (at most one at a
+    time, and not within MONTHLY_TOTALS_RETRY_INTERVAL of a failure) and the
+    caller reads transactions live meanwhile: requests never wait on it.
+    """
+    global _monthly_totals_task
+    now = time.monotonic()
+    
+    if _monthly_totals_refreshed_at is not None and now - _monthly_totals_refreshed_at < MONTHLY_TOTALS_REFRESH_INTERVAL:
+        return True
+    
+    in_flight = _monthly_totals_task is not None and not _monthly_totals_task.done()
+    backing_off = _monthly_totals_failed_at is not None and now - _monthly_totals_failed_at < MONTHLY_TOTALS_RETRY_INTERVAL
+    if not in_flight and not backing_off:
+        _monthly_totals_task = asyncio.create_task(_refresh_monthly_totals_logged())
+    
+    return False
+
+
+def _closed_months_live_stmt(start: date, end: date, category_id: Optional[int] = None):
+    """Same rows as _closed_months_stmt, aggregated from transactions directly."""
+    statement = select(
+        extract('year', Transaction.date).label('year'),
+        extract('month', Transaction.date).label('month'),
+        func.sum(Transaction.amount).filter(Transaction.amount > 0).label('income'),
+        func.sum(Transaction.amount).filter(Transaction.amount < 0).label('expenses'),
+        func.count(Transaction.id).label('count')
+    ).where(
+        Transaction.date >= start,
+        Transaction.date < end
+    ).group_by(
+        extract('year', Transaction.date),
+        extract('month', Transaction.date)
+    )
+    
+    if category_id:
+        statement = statement.where(Transaction.category_id == category_id)
+    
+    return statement
+
+
+def _closed_months(start: date, end: date, category_id: Optional[int] = None):
+    """Statement for the whole months in [start, end): monthly_totals while it is
+    fresh, otherwise a live aggregation over transactions.
+    
+    invalidate_analytics_cache() does not refresh the view, so after
+    import_data.py writes rows, closed months can lag them by up to
+    MONTHLY_TOTALS_REFRESH_INTERVAL (an hour).
+    """
+    if _monthly_totals_fresh():
+        return _closed_months_stmt(start, end, category_id)
+    return _closed_months_live_stmt(start, end, category_id)
+
+
+# In-process TTL cache for slow-changing aggregate responses: {key: (expires_at, value)}.
+# No code path in this tree writes transactions yet (import processing is still a
+# TODO), so staleness is bounded only by ANALYTICS_CACHE_TTL; writers should call
+# invalidate_analytics_cache() once they exist
+ANALYTICS_CACHE_TTL = 60
+ANALYTICS_CACHE_MAX_ENTRIES = 1024
+_analytics_cache: Dict[tuple, tuple] = {}
+_analytics_locks: Dict[tuple, asyncio.Lock] = {}
+
+
+async def _cached(key: tuple, compute):
+    """Return the cached value for key, computing it once (single-flight) when missing or expired."""
+    entry = _analytics_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    
+    # Only the caller that creates the key's lock removes it afterwards
+    lock = _analytics_locks.get(key)
+    created = lock is None
+    if created:
+        lock = _analytics_locks[key] = asyncio.Lock()
+    
+    try:
+        async with lock:
+            # Another request may have filled the entry while we waited
+            entry = _analytics_cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            
+            value = await compute()
+            
+            now = time.monotonic()
+            if len(_analytics_cache) >= ANALYTICS_CACHE_MAX_ENTRIES:
+                for expired in [k for k, (expires_at, _) in _analytics_cache.items() if expires_at <= now]:
+                    del _analytics_cache[expired]
+            _analytics_cache[key] = (now + ANALYTICS_CACHE_TTL, value)
+    finally:
+        # Drop the lock even when compute() raises, so failed keys do not pile up,
+        # but never a newer lock another caller created for the same key
+        if created and _analytics_locks.get(key) is lock:
+            del _analytics_locks[key]
+    
+    return value
+
+
+def invalidate_analytics_cache():
+    """Drop cached analytics responses (call after transactions are written)."""
+    _analytics_cache.clear()
 
 
 class MonthlyTrend(BaseModel):
@@ -45,7 +269,6 @@ class DashboardStats(BaseModel):
 
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
     months: int = Query(12, ge=1, le=24, description="Number of months for trends")
 ):
@@ -53,6 +276,18 @@ async def get_dashboard_stats(
     Get dashboard statistics and trends.
     """
     
+    # The cached dict is already validated: return it directly so it is not
+    # re-validated against the response model on every request
+    stats = await _cached(
+        ("dashboard", user.get("id"), months, date.today()),
+        lambda: _compute_dashboard_stats(months)
+    )
+    return ORJSONResponse(stats, headers=CACHE_HEADERS)
+
+
+async def _compute_dashboard_stats(months: int) -> Dict[str, Any]:
+    """Compute dashboard statistics and trends (as a validated DashboardStats dict)."""
+    
     # Calculate date ranges
     today = date.today()
     current_month_start = today.replace(day=1)
@@ -60,130 +295,123 @@ async def get_dashboard_stats(
     previous_month_start = previous_month_end.replace(day=1)
     trends_start = current_month_start - timedelta(days=30 * months)
     
-    # Current month stats
-    current_month_query = db.query(
-        func.sum(Transaction.amount).filter(Transaction.amount > 0).label('income'),
-        func.sum(Transaction.amount).filter(Transaction.amount < 0).label('expenses'),
-        func.count(Transaction.id).label('count')
-    ).filter(
-        Transaction.date >= current_month_start,
-        Transaction.date <= today
-    ).first()
-    
-    current_month_income = float(current_month_query.income or 0)
-    current_month_expenses = abs(float(current_month_query.expenses or 0))
-    current_month_net = current_month_income - current_month_expenses
-    current_month_count = current_month_query.count or 0
+    week_ago = today - timedelta(days=7)
     
-    # Previous month stats
-    previous_month_query = db.query(
-        func.sum(Transaction.amount).filter(Transaction.amount > 0).label('income'),
-        func.sum(Transaction.amount).filter(Transaction.amount < 0).label('expenses'),
-        func.count(Transaction.id).label('count')
-    ).filter(
-        Transaction.date >= previous_month_start,
-        Transaction.date <= previous_month_end
-    ).first()
-    
-    previous_month_income = float(previous_month_query.income or 0)
-    previous_month_expenses = abs(float(previous_month_query.expenses or 0))
-    previous_month_net = previous_month_income - previous_month_expenses
-    previous_month_count = previous_month_query.count or 0
-    
-    # Monthly trends
-    monthly_trends_query = db.query(
+    # Whole months between the (partial) first trend month and the previous
+    # month come from monthly_totals; only the edge months scan transactions
+    closed_start = _month_after(trends_start)
+    closed_end = max(closed_start, previous_month_start)
+    
+    # One GROUP BY over the live months answers the current month, previous
+    # month and trend edges: trend columns only count dates from trends_start,
+    # period columns only count dates up to today
+    in_trends = Transaction.date >= trends_start
+    to_date = Transaction.date <= today
+    monthly_stmt = select(
         extract('year', Transaction.date).label('year'),
         extract('month', Transaction.date).label('month'),
-        func.sum(Transaction.amount).filter(Transaction.amount > 0).label('income'),
-        func.sum(Transaction.amount).filter(Transaction.amount < 0).label('expenses'),
-        func.count(Transaction.id).label('count')
-    ).filter(
-        Transaction.date >= trends_start
+        func.sum(Transaction.amount).filter(Transaction.amount > 0, in_trends).label('income'),
+        func.sum(Transaction.amount).filter(Transaction.amount < 0, in_trends).label('expenses'),
+        func.count(Transaction.id).filter(in_trends).label('count'),
+        func.sum(Transaction.amount).filter(Transaction.amount > 0, to_date).label('period_income'),
+        func.sum(Transaction.amount).filter(Transaction.amount < 0, to_date).label('period_expenses'),
+        func.count(Transaction.id).filter(to_date).label('period_count')
+    ).where(
+        Transaction.date >= min(trends_start, previous_month_start),
+        or_(Transaction.date < closed_start, Transaction.date >= closed_end)
     ).group_by(
         extract('year', Transaction.date),
         extract('month', Transaction.date)
     ).order_by(
         extract('year', Transaction.date),
         extract('month', Transaction.date)
-    ).all()
-    
-    monthly_trends = []
-    for trend in monthly_trends_query:
-        income = float(trend.income or 0)
-        expenses = abs(float(trend.expenses or 0))
-        monthly_trends.append(MonthlyTrend(
-            month=f"{int(trend.year)}-{int(trend.month):02d}",
-            income=income,
-            expenses=expenses,
-            net=income - expenses,
-            transaction_count=trend.count or 0
-        ))
+    )
     
     # Top categories (current month)
-    top_categories_query = db.query(
+    top_categories_stmt = select(
         Category.id,
         Category.name,
-        func.sum(func.abs(Transaction.amount)).label('total_amount'),
+        total_abs_amount,
         func.count(Transaction.id).label('count')
     ).join(
         Transaction, Category.id == Transaction.category_id
-    ).filter(
+    ).where(
         Transaction.date >= current_month_start,
         Transaction.date <= today
     ).group_by(
         Category.id, Category.name
     ).order_by(
-        func.sum(func.abs(Transaction.amount)).desc()
-    ).limit(10).all()
+        total_abs_amount.desc()
+    ).limit(10)
     
-    # Calculate total for percentages
-    total_categorized = sum(float(cat.total_amount or 0) for cat in top_categories_query)
+    # Recent (last 7 days) and total transaction counts
+    counts_stmt = select(
+        func.count(Transaction.id).filter(Transaction.date >= week_ago),
+        func.count(Transaction.id)
+    )
+    
+    # The queries are independent: run them concurrently
+    monthly_query, closed_query, top_categories_query, ((recent_transactions, total_transactions),) = await _fetch_all(
+        monthly_stmt,
+        _closed_months(closed_start, closed_end),
+        _with_percentage(top_categories_stmt),
+        counts_stmt,
+    )
+    
+    months_by_key = {(int(row.year), int(row.month)): row for row in monthly_query}
+    
+    def period_stats(period_start: date) -> Dict[str, float]:
+        row = months_by_key.get((period_start.year, period_start.month))
+        income = float(row.period_income or 0) if row else 0.0
+        expenses = abs(float(row.period_expenses or 0)) if row else 0.0
+        return {
+            "income": income,
+            "expenses": expenses,
+            "net": income - expenses,
+            "transaction_count": (row.period_count or 0) if row else 0
+        }
+    
+    # Months before trends_start only feed the previous-month stats
+    trend_rows = sorted(
+        [row for row in monthly_query if row.count] + list(closed_query),
+        key=lambda row: (int(row.year), int(row.month))
+    )
+    
+    monthly_trends = []
+    for trend in trend_rows:
+        income = float(trend.income or 0)
+        expenses = abs(float(trend.expenses or 0))
+        monthly_trends.append(MonthlyTrend(
+            month=f"{int(trend.year)}-{int(trend.month):02d}",
+            income=income,
+            expenses=expenses,
+            net=income - expenses,
+            transaction_count=trend.count or 0
+        ))
     
     top_categories = []
     for cat in top_categories_query:
-        amount = float(cat.total_amount or 0)
-        percentage = (amount / total_categorized * 100) if total_categorized > 0 else 0
-        
         top_categories.append(CategoryBreakdown(
             category_id=cat.id,
             category_name=cat.name,
-            amount=amount,
-            percentage=percentage,
+            amount=float(cat.total_amount or 0),
+            percentage=float(cat.percentage),
             transaction_count=cat.count or 0
         ))
     
-    # Recent transactions count (last 7 days)
-    week_ago = today - timedelta(days=7)
-    recent_transactions = db.query(Transaction).filter(
-        Transaction.date >= week_ago
-    ).count()
-    
-    # Total transactions
-    total_transactions = db.query(Transaction).count()
-    
     return DashboardStats(
-        current_month={
-            "income": current_month_income,
-            "expenses": current_month_expenses,
-            "net": current_month_net,
-            "transaction_count": current_month_count
-        },
-        previous_month={
-            "income": previous_month_income,
-            "expenses": previous_month_expenses,
-            "net": previous_month_net,
-            "transaction_count": previous_month_count
-        },
+        current_month=period_stats(current_month_start),
+        previous_month=period_stats(previous_month_start),
         monthly_trends=monthly_trends,
         top_categories=top_categories,
         recent_transactions=recent_transactions,
         total_transactions=total_transactions
-    )
+    ).model_dump()
 
 
 @router.get("/trends/monthly")
 async def get_monthly_trends(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: dict = Depends(get_current_user),
     months: int = Query(12, ge=1, le=36, description="Number of months"),
     category_id: Optional[int] = Query(None, description="Filter by category")
@@ -192,33 +420,48 @@ async def get_monthly_trends(
     Get monthly trends data.
     """
     
+    trends = await _cached(
+        ("trends", user.get("id"), months, category_id, date.today()),
+        lambda: _compute_monthly_trends(db, months, category_id)
+    )
+    return ORJSONResponse(trends, headers=CACHE_HEADERS)
+
+
+async def _compute_monthly_trends(db: AsyncSession, months: int, category_id: Optional[int]) -> List[Dict[str, Any]]:
+    """Compute monthly trends data."""
+    
     # Calculate date range
     today = date.today()
     start_date = today - timedelta(days=30 * months)
     
+    # Whole months before the current one come from monthly_totals; only the
+    # (partial) first month and the current month scan transactions
+    closed_start = _month_after(start_date)
+    closed_end = max(closed_start, today.replace(day=1))
+    
     # Build query
-    query = db.query(
+    query = select(
         extract('year', Transaction.date).label('year'),
         extract('month', Transaction.date).label('month'),
         func.sum(Transaction.amount).filter(Transaction.amount > 0).label('income'),
         func.sum(Transaction.amount).filter(Transaction.amount < 0).label('expenses'),
         func.count(Transaction.id).label('count')
-    ).filter(
-        Transaction.date >= start_date
+    ).where(
+        Transaction.date >= start_date,
+        or_(Transaction.date < closed_start, Transaction.date >= closed_end)
     )
     
     # Apply category filter
     if category_id:
-        query = query.filter(Transaction.category_id == category_id)
+        query = query.where(Transaction.category_id == category_id)
     
-    # Group and order
-    trends = query.group_by(
-        extract('year', Transaction.date),
-        extract('month', Transaction.date)
-    ).order_by(
+    # Group, then merge with the precomputed months in order
+    live = (await db.execute(query.group_by(
         extract('year', Transaction.date),
         extract('month', Transaction.date)
-    ).all()
+    ))).all()
+    closed = (await db.execute(_closed_months(closed_start, closed_end, category_id))).all()
+    trends = sorted(live + closed, key=lambda row: (int(row.year), int(row.month)))
     
     # Format response
     result = []
@@ -238,7 +481,7 @@ async def get_monthly_trends(
 
 @router.get("/categories/breakdown")
 async def get_category_breakdown(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: dict = Depends(get_current_user),
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
@@ -250,11 +493,11 @@ async def get_category_breakdown(
     """
     
     # Build query
-    query = db.query(
+    query = select(
         Category.id,
         Category.name,
         Category.category_type,
-        func.sum(func.abs(Transaction.amount)).label('total_amount'),
+        total_abs_amount,
         func.count(Transaction.id).label('count')
     ).outerjoin(
         Transaction, Category.id == Transaction.category_id
@@ -275,30 +518,24 @@ async def get_category_breakdown(
         filters.append(Transaction.amount < 0)
     
     if filters:
-        query = query.filter(and_(*filters))
+        query = query.where(and_(*filters))
     
     # Group and order
-    categories = query.group_by(
+    categories = (await db.execute(_with_percentage(query.group_by(
         Category.id, Category.name, Category.category_type
     ).order_by(
-        func.sum(func.abs(Transaction.amount)).desc()
-    ).limit(limit).all()
-    
-    # Calculate total for percentages
-    total_amount = sum(float(cat.total_amount or 0) for cat in categories)
+        total_abs_amount.desc()
+    ).limit(limit)))).all()
     
-    # Format response
+    # Format response (percentages of the returned total come from SQL)
     result = []
     for cat in categories:
-        amount = float(cat.total_amount or 0)
-        percentage = (amount / total_amount * 100) if total_amount > 0 else 0
-        
         result.append({
             "category_id": cat.id,
             "category_name": cat.name,
             "category_type": cat.category_type,
-            "amount": amount,
-            "percentage": percentage,
+            "amount": float(cat.total_amount or 0),
+            "percentage": float(cat.percentage),
             "transaction_count": cat.count or 0
         })
     
@@ -307,7 +544,6 @@ async def get_category_breakdown(
 
 @router.get("/spending/patterns")
 async def get_spending_patterns(
-    db: Session = Depends(get_db),
     user: dict = Depends(get_current_user),
     days: int = Query(90, ge=7, le=365, description="Number of days to analyze")
 ):
@@ -319,75 +555,70 @@ async def get_spending_patterns(
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     
-    # Daily spending
-    daily_spending = db.query(
+    # Daily spending (also feeds the day-of-week pattern, aggregated below)
+    daily_spending_stmt = select(
         Transaction.date,
-        func.sum(func.abs(Transaction.amount)).filter(Transaction.amount < 0).label('daily_expenses')
-    ).filter(
+        func.sum(abs_amount).label('daily_expenses'),
+        func.count(Transaction.id).label('transaction_count')
+    ).where(
         Transaction.date >= start_date,
         Transaction.amount < 0
     ).group_by(
         Transaction.date
     ).order_by(
         Transaction.date
-    ).all()
-    
-    # Weekly patterns (day of week)
-    weekly_pattern = db.query(
-        extract('dow', Transaction.date).label('day_of_week'),
-        func.sum(func.abs(Transaction.amount)).filter(Transaction.amount < 0).label('total_expenses'),
-        func.count(Transaction.id).filter(Transaction.amount < 0).label('transaction_count')
-    ).filter(
-        Transaction.date >= start_date,
-        Transaction.amount < 0
-    ).group_by(
-        extract('dow', Transaction.date)
-    ).order_by(
-        extract('dow', Transaction.date)
-    ).all()
+    )
     
     # Top merchants/counterparts
-    top_merchants = db.query(
+    top_merchants_stmt = select(
         Transaction.counterpart_name,
-        func.sum(func.abs(Transaction.amount)).label('total_amount'),
+        total_abs_amount,
         func.count(Transaction.id).label('transaction_count')
-    ).filter(
+    ).where(
         Transaction.date >= start_date,
         Transaction.counterpart_name.isnot(None),
         Transaction.amount < 0
     ).group_by(
         Transaction.counterpart_name
     ).order_by(
-        func.sum(func.abs(Transaction.amount)).desc()
-    ).limit(10).all()
+        total_abs_amount.desc()
+    ).limit(10)
     
-    # Format response
-    day_names = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+    # Independent queries: run them concurrently
+    daily_spending, top_merchants = await _fetch_all(daily_spending_stmt, top_merchants_stmt)
     
+    # Weekly patterns from the daily totals (day_number 0 = Sunday, as PostgreSQL's dow)
+    weekly_pattern = {}
+    for day, expenses, count in daily_spending:
+        day_number = day.isoweekday() % 7
+        total, transactions = weekly_pattern.get(day_number, (0, 0))
+        weekly_pattern[day_number] = (total + (expenses or 0), transactions + count)
+    
+    # Format response
     return {
         "daily_spending": [
             {
-                "date": spending.date.isoformat(),
-                "amount": float(spending.daily_expenses or 0)
+                "date": day.isoformat(),
+                "amount": float(expenses or 0)
             }
-            for spending in daily_spending
+            for day, expenses, _ in daily_spending
         ],
         "weekly_pattern": [
             {
-                "day_of_week": day_names[int(pattern.day_of_week)],
-                "day_number": int(pattern.day_of_week),
-                "total_expenses": float(pattern.total_expenses or 0),
-                "transaction_count": pattern.transaction_count or 0
+                "day_of_week": DAY_NAMES[day_number],
+                "day_number": day_number,
+                "total_expenses": float(total),
+                "transaction_count": transactions
             }
-            for pattern in weekly_pattern
+            for day_number, (total, transactions) in sorted(weekly_pattern.items())
         ],
         "top_merchants": [
             {
-                "name": merchant.counterpart_name,
-                "total_amount": float(merchant.total_amount or 0),
-                "transaction_count": merchant.transaction_count or 0
+                "name": name,
+                "total_amount": float(total_amount or 0),
+                "transaction_count": transaction_count or 0
             }
-            for merchant in top_merchants
+            for name, total_amount, transaction_count in top_merchants
         ]
     }
 
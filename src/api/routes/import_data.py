@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from src.models import get_db, ImportBatch
 from src.api.middleware.auth import get_current_user
+from src.api.routes.analytics import invalidate_analytics_cache
 from src.config import settings
 
 router = APIRouter()
@@ -244,6 +245,11 @@ async def process_import_batch(
     # TODO: Implement actual file processing
     # This would typically be done asynchronously using Celery or similar
     
+    # Imported transactions change the aggregates: drop cached analytics. No rows
+    # are written here yet, so until the processing above exists cached analytics
+    # can lag new data by up to ANALYTICS_CACHE_TTL (60s)
+    invalidate_analytics_cache()
+    
     return {
         "message": "Import processing started",
         "batch_id": batch_id,
@@ -8,7 +8,7 @@ from decimal import Decimal
 from typing import Optional, Dict, Any
 from sqlalchemy import (
     Column, Integer, String, Numeric, DateTime, Date, Boolean, 
-    Text, JSON, Index, ForeignKey, Enum as SQLEnum, CheckConstraint
+    Text, JSON, Index, ForeignKey, Enum as SQLEnum, CheckConstraint, text
 )
 from sqlalchemy.orm import relationship, validates
 from sqlalchemy.dialects.postgresql import UUID, JSONB
@@ -107,6 +107,9 @@ class Transaction(Base):
     __table_args__ = (
         CheckConstraint('amount != 0', name='amount_not_zero'),
         Index('idx_date_amount', 'date', 'amount'),
+        # Covering index for the analytics aggregates (index-only scans by date range)
+        Index('idx_date_covering', 'date', postgresql_include=['amount', 'category_id', 'counterpart_name']),
+        Index('idx_date_expenses', 'date', postgresql_where=text('amount < 0')),
         Index('idx_description_search', 'description'),
         Index('idx_recurring_group', 'recurring_group_id', 'date'),
         Index('idx_import_batch', 'import_batch_id'),
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from sqlalchemy.pool import QueuePool
 import redis
+import redis.asyncio
 from loguru import logger
 
 # Database URL configuration
@@ -27,6 +28,8 @@ engine = create_engine(
     max_overflow=30,
     pool_pre_ping=True,
     pool_recycle=3600,
+    # Compiled SQL cache (the analytics routes build many distinct statements)
+    query_cache_size=1200,
     echo=os.getenv("DEBUG", "false").lower() == "true",
     connect_args={
         "options": "-c timezone=America/Sao_Paulo",
@@ -42,6 +45,8 @@ async_engine = create_async_engine(
     max_overflow=30,
     pool_pre_ping=True,
     pool_recycle=3600,
+    # Compiled SQL cache (the analytics routes build many distinct statements)
+    query_cache_size=1200,
     echo=os.getenv("DEBUG", "false").lower() == "true",
 )
 
@@ -61,6 +66,7 @@ AsyncSessionLocal = async_sessionmaker(
 
 # Redis connection
 redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+async_redis_client = redis.asyncio.from_url(REDIS_URL, decode_responses=True)
 
 # Metadata for migrations
 metadata = MetaData(
@@ -126,6 +132,11 @@ def get_redis():
     return redis_client
 
 
+def get_async_redis():
+    """Get async Redis client."""
+    return async_redis_client
+
+
 class DatabaseManager:
     """Database management utilities."""
     